@@ -1,21 +1,20 @@
+import argparse
+import sys
 from pathlib import Path
-from utils.keyword_analysis import (
-    parse_bibtex_abstracts,
-    analyze_keyword_category
-)
-from utils.merge_bibtex_entries import main as merge_bibtex_main
-from utils.analyze_bibtex import run_analysis
-from utils.graph_statistics import main as graph_statistics_main
-from utils.similarity_jaccard import run_jaccard_similarity
-from utils.similarity_plot import plot_similarity_graph
-from utils.similarity_tfidf import run_tfidf_similarity
-from scrapers.acm_scraper import scrape_acm_bibtex
+
+# Heavy dependencies (selenium, matplotlib, wordcloud, networkx, scikit-learn, scipy)
+# are imported inside each command so that e.g. `python main.py merge` only loads what it needs
 
 # routes
 BIB_PATH = Path("data/processed/merged.bib")
 FIGURES_DIR = Path("figures/keywords")
 OUTPUT_DIR = Path("data/processed")
-FIGURES_DIR.mkdir(parents=True, exist_ok=True)
+JACCARD_JSON = Path("data/processed/jaccard_similarity.json")
+JACCARD_GRAPH = Path("figures/similarity/jaccard_graph.png")
+TFIDF_JSON = Path("data/processed/tfidf_similarity.json")
+TFIDF_GRAPH = Path("figures/similarity/tfidf_graph.png")
+SEMANTIC_JSON = Path("data/processed/semantic_similarity.json")
+SEMANTIC_GRAPH = Path("figures/similarity/semantic_graph.png")
 
 # categories
 SKILLS = [
@@ -93,23 +92,168 @@ TOOL = [
     "Agent Sheets", "Mimo", "Py–Learn", "SpaceChem"
 ]
 
+KEYWORD_CATEGORIES = {
+    "Skills": SKILLS, "Computational concepts": CONCEPTS, "Attitudes": ATTITUDES,
+    "Properties": PROPERTIES, "Assessment": ASSESSMENT, "Research": RESEARCH,
+    "Education": EDUCATION, "Medium": MEDIUM, "Strategy": STRATEGY, "Tool": TOOL,
+}
+
+
+def write_to_store(writer, *args, **kwargs):
+    """
+    Opens the analysis database, runs one of its write functions and closes it
+    """
+    from utils.analysis_store import open_store
+    conn = open_store()
+    try:
+        writer(conn, *args, **kwargs)
+    finally:
+        conn.close()
+
+def run_merge(workers=None):
+    from utils.raw_ingest import main as merge_raw_main
+    from utils.entity_index import update_entity_index
+    from utils.analyze_bibtex import parse_bibtex_entries
+    from utils.analysis_store import write_entries, entry_rows
+    merge_raw_main(workers)
+    update_entity_index()
+    write_to_store(write_entries, entry_rows(parse_bibtex_entries(BIB_PATH)), replace_all=True)
+
+def run_stats():
+    from utils.analyze_bibtex import run_analysis
+    from utils.entity_index import update_entity_index
+    from utils.graph_statistics import main as graph_statistics_main
+    run_analysis(update_entity_index())
+    graph_statistics_main()
 
-def run_requirement_3():
+def run_requirement_3(workers=None, force=False):
+    from utils.keyword_analysis import parse_bibtex_abstracts, build_keyword_category
+    from utils.keyword_visualization import render_keyword_figures
+    from utils.analysis_store import write_keyword_hits
+    FIGURES_DIR.mkdir(parents=True, exist_ok=True)
     print("🔍 Extracting abstracts...")
     abstracts = parse_bibtex_abstracts(BIB_PATH)
 
-    analyze_keyword_category(SKILLS, "Skills", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(CONCEPTS, "Computational concepts", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(ATTITUDES, "Attitudes", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(PROPERTIES, "Properties", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(ASSESSMENT, "Assessment", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(RESEARCH, "Research", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(EDUCATION, "Education", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(MEDIUM, "Medium", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(STRATEGY, "Strategy", abstracts, OUTPUT_DIR, FIGURES_DIR)
-    analyze_keyword_category(TOOL, "Tool", abstracts, OUTPUT_DIR, FIGURES_DIR)
-
-def main():
+    jobs = [
+        build_keyword_category(keywords, name, abstracts, OUTPUT_DIR, FIGURES_DIR)
+        for name, keywords in KEYWORD_CATEGORIES.items()
+    ]
+    for job in jobs:
+        write_to_store(write_keyword_hits, job["title"], job["frequencies"])
+    rendered = render_keyword_figures(jobs, workers=workers, force=force)
+    print(f"Keyword analysis saved in '{FIGURES_DIR}' and '{OUTPUT_DIR}' ({rendered} categories re-rendered)")
+
+def run_trends(kind=None, name=None, category=None):
+    from utils.entity_index import update_entity_index
+    from utils.trend_store import run_trend_analysis, trend, plot_trends
+    index = update_entity_index()
+    run_trend_analysis(KEYWORD_CATEGORIES, index)
+    if kind and name:
+        series = trend(kind, name, category, index)
+        for year, count in series.items():
+            print(f"  {year}: {count}")
+        # Separate prefix so ad-hoc plots never overwrite the per-category figures
+        slug = "".join(c if c.isalnum() else "_" for c in name.lower())
+        plot_trends({name: series}, f"{name} per Year", f"single_{kind}_{slug}.png")
+
+# method -> (JSON output, graph output, graph title)
+SIMILARITY_OUTPUTS = {
+    "jaccard": (JACCARD_JSON, JACCARD_GRAPH, "Jaccard Similarity Graph (abstracts)"),
+    "tfidf": (TFIDF_JSON, TFIDF_GRAPH, "TF-IDF Similarity Graph (abstracts)"),
+    "semantic": (SEMANTIC_JSON, SEMANTIC_GRAPH, "Semantic Similarity Graph (abstracts)"),
+}
+
+def run_pipeline(source="drop", pages=None, drop_dir=None, idle_timeout=10.0, threshold=0.4):
+    import asyncio
+    from functools import partial
+    from utils.pipeline import run_pipeline as run_streaming_pipeline, scrape_source, file_drop_source, DROP_DIR
+    if source == "scrape":
+        producer = partial(scrape_source, pages or [0])
+    else:
+        producer = partial(file_drop_source, drop_dir or DROP_DIR, idle_timeout=idle_timeout)
+    asyncio.run(run_streaming_pipeline(producer, KEYWORD_CATEGORIES, threshold=threshold))
+
+def store_and_plot_similarity(method, pairs):
+    """
+    Saves similarity pairs in the analysis database and draws the method's graph from it
+    """
+    from utils.analysis_store import write_similarity_pairs
+    from utils.similarity_plot import plot_similarity_graph
+    json_path, graph_path, title = SIMILARITY_OUTPUTS[method]
+    write_to_store(write_similarity_pairs, method, pairs)
+    graph_path.parent.mkdir(parents=True, exist_ok=True)
+    plot_similarity_graph(json_path, graph_path, title=title, method=method)
+
+def run_jaccard(threshold=0.4):
+    from utils.similarity_jaccard import run_jaccard_similarity
+    from utils.similarity_scores import scores_path
+    pairs = run_jaccard_similarity(BIB_PATH, JACCARD_JSON, threshold=threshold, scores_path=scores_path("jaccard"))
+    store_and_plot_similarity("jaccard", pairs)
+
+def run_tfidf(threshold=0.6):
+    from utils.similarity_tfidf import run_tfidf_similarity
+    from utils.similarity_scores import scores_path
+    pairs = run_tfidf_similarity(BIB_PATH, TFIDF_JSON, threshold=threshold, scores_path=scores_path("tfidf"))
+    store_and_plot_similarity("tfidf", pairs)
+
+def run_semantic(threshold=0.7, top_k=10, refit=False):
+    from utils.similarity_semantic import run_semantic_similarity
+    from utils.similarity_scores import scores_path
+    pairs = run_semantic_similarity(BIB_PATH, SEMANTIC_JSON, threshold=threshold, top_k=top_k, refit=refit,
+                                    scores_path=scores_path("semantic"))
+    store_and_plot_similarity("semantic", pairs)
+
+def run_sweep(method, thresholds):
+    from utils.similarity_scores import run_threshold_sweep
+    run_threshold_sweep(method, thresholds)
+
+def run_export_threshold(method, threshold):
+    from utils.similarity_scores import export_threshold
+    pairs = export_threshold(method, threshold, SIMILARITY_OUTPUTS[method][0])
+    if pairs is not None:
+        store_and_plot_similarity(method, pairs)
+
+def run_query(key, min_similarity=0.0, method=None):
+    from utils.analysis_store import open_store, pairs_for
+    conn = open_store()
+    try:
+        pairs = pairs_for(conn, key, min_similarity, method)
+    finally:
+        conn.close()
+    print(f"{len(pairs)} pairs involving {key} with similarity >= {min_similarity}:")
+    for p in pairs:
+        print(f"  [{p['method']}] {p['source']} - {p['target']}: {p['similarity']}")
+
+def run_export_json():
+    from utils.analysis_store import open_store, export_json
+    conn = open_store()
+    try:
+        written = export_json(conn, OUTPUT_DIR)
+    finally:
+        conn.close()
+    print(f"Exported {len(written)} JSON files to '{OUTPUT_DIR}'")
+
+def run_network():
+    from utils.coauthorship_network import run_coauthorship_network
+    run_coauthorship_network()
+
+def run_scrape(page):
+    from scrapers.acm_scraper import scrape_acm_bibtex
+    scrape_acm_bibtex(page)
+
+def run_entity_lookup(kind, name):
+    from utils.entity_index import load_index, lookup, counts_by_year
+    index = load_index()
+    entity = lookup(index, kind, name)
+    if not entity:
+        print(f"No {kind} found for '{name}'")
+        return
+    print(f"\n{entity['name']} ({len(entity['entries'])} publications)")
+    print(f"  Aliases: {', '.join(entity['variants'])}")
+    for year, count in counts_by_year(index, kind, name).items():
+        print(f"    {year}: {count}")
+
+def interactive_menu():
     print("Welcome to the Bibliometric Analysis Tool")
     while True:
         print("\nPlease choose an option:")
@@ -118,38 +262,134 @@ def main():
         print("3. Analyze keywords: word clouds and co-occurrence graphs")
         print("4. Similarity using Jaccard (JSON + Graph)")
         print("5. Similarity using TF-IDF + Cosine Similarity")
+        print("6. Look up an author or venue")
+        print("7. Co-authorship network (degree, PageRank, components)")
+        print("8. Trends by year (types, venues, keywords)")
+        print("9. Semantic similarity (LSA embeddings + nearest-neighbour index)")
         print("Type 'scrape' to scrape articles from ACM")
         print("Type 'exit' to quit.")
         choice = input("➤ Enter your choice: ").strip().lower()
         if choice == "1":
-            merge_bibtex_main()
+            run_merge()
         elif choice == "2":
-            run_analysis()
-            graph_statistics_main()
+            run_stats()
         elif choice == "3":
             run_requirement_3()
         elif choice == "exit":
             print("Goodbye!")
             break
         elif choice == "4":
-            SIMILARITY_JSON = Path("data/processed/jaccard_similarity.json")
-            GRAPH_PATH = Path("figures/similarity/jaccard_graph.png")
-            run_jaccard_similarity(BIB_PATH, SIMILARITY_JSON, threshold=0.4)
-            plot_similarity_graph(SIMILARITY_JSON, GRAPH_PATH)
+            run_jaccard(threshold=0.4)
         elif choice == "5":
-            TFIDF_JSON = Path("data/processed/tfidf_similarity.json")
-            TFIDF_GRAPH = Path("figures/similarity/tfidf_graph.png")
-            run_tfidf_similarity(BIB_PATH, TFIDF_JSON, threshold=0.6)
-            plot_similarity_graph(TFIDF_JSON, TFIDF_GRAPH)
+            run_tfidf(threshold=0.6)
+        elif choice == "6":
+            kind = input("Entity type (author/journal/publisher): ").strip().lower()
+            if kind not in ("author", "journal", "publisher"):
+                print("X Invalid entity type")
+                continue
+            run_entity_lookup(kind, input(f"Enter {kind} name: ").strip())
+        elif choice == "7":
+            run_network()
+        elif choice == "8":
+            run_trends()
+        elif choice == "9":
+            run_semantic(threshold=0.7)
         elif choice == "scrape":
             try:
                 page = int(input("Enter ACM start page (e.g. 0, 1, 2...): "))
-                scrape_acm_bibtex(page)
+                run_scrape(page)
             except ValueError:
                 print("Invalid input. Please enter a valid number")
         else:
-            print("X Invalid option. Please enter 1, 2, 3 or 'exit'.")
+            print("X Invalid option. Please enter 1-9, 'scrape' or 'exit'.")
 
-if __name__ == "__main__":
-    main()
+def build_parser():
+    """
+    Builds the command-line parser; running without a subcommand opens the interactive menu
+    """
+    parser = argparse.ArgumentParser(description="Bibliometric Analysis Tool")
+    subparsers = parser.add_subparsers(dest="command")
+
+    merge = subparsers.add_parser("merge", help="Merge BibTeX files and detect duplicates")
+    merge.add_argument("--workers", type=int, default=None, help="Parallel parsing processes (default: CPU count)")
+    merge.set_defaults(func=lambda args: run_merge(args.workers))
+    subparsers.add_parser("stats", help="Generate general statistics and plots") \
+        .set_defaults(func=lambda args: run_stats())
+    keywords = subparsers.add_parser("keywords", help="Keyword word clouds and co-occurrence graphs")
+    keywords.add_argument("--workers", type=int, default=None, help="Parallel rendering processes")
+    keywords.add_argument("--force", action="store_true", help="Re-render figures even if their data is unchanged")
+    keywords.set_defaults(func=lambda args: run_requirement_3(args.workers, args.force))
+
+    jaccard = subparsers.add_parser("jaccard", help="Similarity using Jaccard (JSON + graph)")
+    jaccard.add_argument("--threshold", type=float, default=0.4)
+    jaccard.set_defaults(func=lambda args: run_jaccard(args.threshold))
+
+    tfidf = subparsers.add_parser("tfidf", help="Similarity using TF-IDF + cosine similarity")
+    tfidf.add_argument("--threshold", type=float, default=0.6)
+    tfidf.set_defaults(func=lambda args: run_tfidf(args.threshold))
+
+    semantic = subparsers.add_parser("semantic", help="Semantic similarity using LSA embeddings and an ANN index")
+    semantic.add_argument("--threshold", type=float, default=0.7)
+    semantic.add_argument("--top-k", type=int, default=10, help="Neighbours kept per abstract")
+    semantic.add_argument("--refit", action="store_true", help="Refit the embedding model on the current corpus")
+    semantic.set_defaults(func=lambda args: run_semantic(args.threshold, args.top_k, args.refit))
+
+    sweep = subparsers.add_parser("sweep", help="Edge/component counts and histogram for many thresholds")
+    sweep.add_argument("method", choices=list(SIMILARITY_OUTPUTS))
+    sweep.add_argument("--thresholds", type=float, nargs="+",
+                       default=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+    sweep.set_defaults(func=lambda args: run_sweep(args.method, args.thresholds))
+
+    export = subparsers.add_parser("export-threshold", help="Regenerate similarity JSON and graph from stored scores")
+    export.add_argument("method", choices=list(SIMILARITY_OUTPUTS))
+    export.add_argument("--threshold", type=float, required=True)
+    export.set_defaults(func=lambda args: run_export_threshold(args.method, args.threshold))
 
+    pipeline = subparsers.add_parser("pipeline", help="Stream new BibTeX files into merge and incremental analysis")
+    pipeline.add_argument("--source", choices=["drop", "scrape"], default="drop",
+                          help="Watch a drop directory (default) or scrape ACM pages")
+    pipeline.add_argument("--pages", type=int, nargs="+", default=[0], help="ACM pages to scrape")
+    pipeline.add_argument("--drop-dir", type=Path, default=None, help="Directory watched for new .bib files")
+    pipeline.add_argument("--idle-timeout", type=float, default=10.0, help="Seconds without new files before stopping")
+    pipeline.add_argument("--threshold", type=float, default=0.4, help="Jaccard threshold for new-vs-existing pairs")
+    pipeline.set_defaults(func=lambda args: run_pipeline(args.source, args.pages, args.drop_dir,
+                                                         args.idle_timeout, args.threshold))
+
+    query = subparsers.add_parser("query", help="Similarity pairs involving an entry, from the analysis database")
+    query.add_argument("key", help="BibTeX citation key or DOI of the entry")
+    query.add_argument("--min", type=float, default=0.0, dest="min_similarity")
+    query.add_argument("--method", choices=[*SIMILARITY_OUTPUTS, "stream_jaccard"], default=None)
+    query.set_defaults(func=lambda args: run_query(args.key, args.min_similarity, args.method))
+
+    subparsers.add_parser("export-json", help="Export the analysis database to the JSON files in data/processed") \
+        .set_defaults(func=lambda args: run_export_json())
+
+    subparsers.add_parser("network", help="Co-authorship network analytics") \
+        .set_defaults(func=lambda args: run_network())
+
+    trends = subparsers.add_parser("trends", help="Year-partitioned trends for types, venues, authors and keywords")
+    trends.add_argument("kind", nargs="?", choices=["types", "venues", "authors", "keywords"])
+    trends.add_argument("name", nargs="?", help="Type, venue, author or keyword to plot")
+    trends.add_argument("--category", choices=list(KEYWORD_CATEGORIES),
+                        help="Keyword category (default: all categories)")
+    trends.set_defaults(func=lambda args: run_trends(args.kind, args.name, args.category))
+
+    lookup = subparsers.add_parser("lookup", help="Look up an author or venue in the entity index")
+    lookup.add_argument("kind", choices=["author", "journal", "publisher"])
+    lookup.add_argument("name")
+    lookup.set_defaults(func=lambda args: run_entity_lookup(args.kind, args.name))
+
+    scrape = subparsers.add_parser("scrape", help="Scrape BibTeX entries from ACM")
+    scrape.add_argument("--page", type=int, default=0, help="ACM start page")
+    scrape.set_defaults(func=lambda args: run_scrape(args.page))
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        interactive_menu()
+    else:
+        args.func(args)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -9,13 +9,17 @@ import shutil
 import time
 import os
 
-def scrape_acm_bibtex(start_page: int):
+def scrape_acm_bibtex(start_page: int, interactive: bool = True):
     """
     Launches a headless Firefox browser, navigates to ACM Digital Library,
     accepts cookies, selects all results on the page, and downloads citations in BibTeX format
     Args:
         start_page (int): Page number to start the search from
+        interactive (bool): Wait for Enter before closing the browser
+    Returns:
+        Path | None: Path of the saved BibTeX file, or None if scraping failed
     """
+    final_path = None
     download_dir = str(Path("downloads").resolve())
     output_dir = Path("data/raw")
     Path(download_dir).mkdir(parents=True, exist_ok=True)
@@ -75,11 +79,14 @@ def scrape_acm_bibtex(start_page: int):
 
         print(f"BibTeX file saved to: {final_path}")
 
-        input("Press Enter to close the browser...")
+        if interactive:
+            input("Press Enter to close the browser...")
     except Exception as e:
         print(f"Error during scraping: {e}")
+        final_path = None
     finally:
         driver.quit()
+    return final_path
 
 
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+from pathlib import Path
+import json
+import sqlite3
+from .analyze_bibtex import extract_field
+from .merge_bibtex_entries import extract_key
+
+# Path
+STORE_PATH = Path("data/processed/analysis.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    citation_key TEXT,
+    type TEXT,
+    year TEXT,
+    title TEXT,
+    doi TEXT,
+    journal TEXT,
+    publisher TEXT,
+    author TEXT,
+    abstract TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_citation_key ON entries (citation_key);
+CREATE INDEX IF NOT EXISTS entries_year ON entries (year, type);
+
+CREATE TABLE IF NOT EXISTS keyword_hits (
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (category, keyword)
+);
+
+CREATE TABLE IF NOT EXISTS similarity_pairs (
+    method TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    similarity REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS similarity_by_source ON similarity_pairs (method, source, similarity);
+CREATE INDEX IF NOT EXISTS similarity_by_target ON similarity_pairs (method, target, similarity);
+CREATE INDEX IF NOT EXISTS similarity_by_score ON similarity_pairs (method, similarity);
+
+CREATE TABLE IF NOT EXISTS stats (
+    section TEXT NOT NULL,
+    grp TEXT NOT NULL DEFAULT '',
+    label TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (section, grp, label)
+);
+"""
+
+# stats.json sections stored as flat {label: value} mappings
+FLAT_STAT_SECTIONS = ("top_authors", "product_type_counts", "top_journals", "top_publishers")
+GROUPED_STAT_SECTION = "publication_year_by_type"
+ENTRY_COLUMNS = ("key", "citation_key", "type", "year", "title", "doi", "journal", "publisher", "author", "abstract")
+
+def open_store(path=STORE_PATH):
+    """
+    Opens (and creates if needed) the analysis database
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def store_exists(path=STORE_PATH):
+    """
+    Returns True if the analysis database has been created
+    """
+    return Path(path).exists()
+
+def entry_rows(entries):
+    """
+    Converts raw BibTeX entries into rows for the `entries` table
+    Rows are keyed by the same DOI/title key used for deduplication
+    """
+    for entry in entries:
+        key = extract_key(entry)
+        if not key:
+            continue
+        row = {
+            "key": key,
+            "citation_key": entry.split("{", 1)[-1].split(",", 1)[0].strip(),
+            "type": entry.split("{", 1)[0].replace("@", "").strip().lower(),
+        }
+        for field in ("year", "title", "doi", "journal", "publisher", "author", "abstract"):
+            row[field] = extract_field(entry, field)
+        yield row
+
+def write_entries(conn, rows, replace_all=False):
+    """
+    Inserts or replaces entry rows (dicts keyed by ENTRY_COLUMNS) in one transaction
+    With `replace_all` the table is emptied first (used after a full merge)
+    """
+    placeholders = ", ".join("?" for _ in ENTRY_COLUMNS)
+    with conn:
+        if replace_all:
+            conn.execute("DELETE FROM entries")
+        conn.executemany(
+            f"INSERT OR REPLACE INTO entries ({', '.join(ENTRY_COLUMNS)}) VALUES ({placeholders})",
+            ([row.get(c) for c in ENTRY_COLUMNS] for row in rows),
+        )
+
+def write_keyword_hits(conn, category, counts):
+    """
+    Replaces the keyword frequencies of a category in one transaction
+    """
+    with conn:
+        conn.execute("DELETE FROM keyword_hits WHERE category = ?", (category,))
+        conn.executemany(
+            "INSERT INTO keyword_hits (category, keyword, hits) VALUES (?, ?, ?)",
+            ((category, keyword, hits) for keyword, hits in counts.items()),
+        )
+
+def write_similarity_pairs(conn, method, pairs):
+    """
+    Replaces all similarity pairs of a method ([{source, target, similarity}]) in one transaction
+    """
+    with conn:
+        conn.execute("DELETE FROM similarity_pairs WHERE method = ?", (method,))
+        conn.executemany(
+            "INSERT INTO similarity_pairs (method, source, target, similarity) VALUES (?, ?, ?, ?)",
+            ((method, p["source"], p["target"], p["similarity"]) for p in pairs),
+        )
+
+def add_similarity_pairs(conn, method, pairs):
+    """
+    Appends similarity pairs of a method ([{source, target, similarity}]) in one transaction
+    """
+    with conn:
+        conn.executemany(
+            "INSERT INTO similarity_pairs (method, source, target, similarity) VALUES (?, ?, ?, ?)",
+            ((method, p["source"], p["target"], p["similarity"]) for p in pairs),
+        )
+
+def write_stats(conn, stats):
+    """
+    Replaces the statistics with a `stats.json`-shaped dictionary in one transaction
+    """
+    rows = []
+    for section in FLAT_STAT_SECTIONS:
+        for position, (label, value) in enumerate(stats.get(section, {}).items()):
+            rows.append((section, "", label, value, position))
+    for grp, values in stats.get(GROUPED_STAT_SECTION, {}).items():
+        for position, (label, value) in enumerate(values.items()):
+            rows.append((GROUPED_STAT_SECTION, grp, label, value, position))
+    with conn:
+        conn.execute("DELETE FROM stats")
+        conn.executemany(
+            "INSERT INTO stats (section, grp, label, value, position) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+def load_stats(conn):
+    """
+    Returns the statistics in the same shape as `stats.json`, or None if none were stored
+    """
+    cursor = conn.execute("SELECT section, grp, label, value FROM stats ORDER BY section, grp, position")
+    stats = {section: {} for section in FLAT_STAT_SECTIONS}
+    stats[GROUPED_STAT_SECTION] = {}
+    found = False
+    for section, grp, label, value in cursor:
+        found = True
+        if section == GROUPED_STAT_SECTION:
+            stats[section].setdefault(grp, {})[label] = value
+        else:
+            stats[section][label] = value
+    return stats if found else None
+
+def load_keyword_hits(conn, category):
+    """
+    Returns the keyword frequencies {keyword: hits} of a category
+    """
+    cursor = conn.execute("SELECT keyword, hits FROM keyword_hits WHERE category = ? ORDER BY rowid", (category,))
+    return dict(cursor.fetchall())
+
+def load_similarity_pairs(conn, method, min_similarity=0.0):
+    """
+    Returns the pairs of a method with similarity >= min_similarity, in the JSON output schema
+    """
+    cursor = conn.execute(
+        "SELECT source, target, similarity FROM similarity_pairs "
+        "WHERE method = ? AND similarity >= ? ORDER BY rowid",
+        (method, min_similarity),
+    )
+    return [{"source": s, "target": t, "similarity": sim} for s, t, sim in cursor]
+
+def has_similarity_pairs(conn, method):
+    """
+    Returns True if pairs were stored for a similarity method
+    """
+    return conn.execute("SELECT 1 FROM similarity_pairs WHERE method = ? LIMIT 1", (method,)).fetchone() is not None
+
+def pairs_for(conn, key, min_similarity=0.0, method=None):
+    """
+    Returns all pairs involving an entry with similarity >= min_similarity
+    Pairs are keyed by BibTeX citation key; a DOI/title key from the `entries` table is mapped to it
+    Both directions are answered from the (method, source/target, similarity) indexes
+    """
+    row = conn.execute("SELECT citation_key FROM entries WHERE key = ?", (key.lower(),)).fetchone()
+    if row and row[0]:
+        key = row[0]
+    methods = [method] if method else [
+        row[0] for row in conn.execute("SELECT DISTINCT method FROM similarity_pairs")
+    ]
+    results = []
+    for m in methods:
+        cursor = conn.execute(
+            "SELECT method, source, target, similarity FROM similarity_pairs "
+            "WHERE method = ? AND source = ? AND similarity >= ? "
+            "UNION ALL "
+            "SELECT method, source, target, similarity FROM similarity_pairs "
+            "WHERE method = ? AND target = ? AND similarity >= ?",
+            (m, key, min_similarity, m, key, min_similarity),
+        )
+        results.extend(
+            {"method": row[0], "source": row[1], "target": row[2], "similarity": row[3]} for row in cursor
+        )
+    return sorted(results, key=lambda p: -p["similarity"])
+
+def export_json(conn, output_dir):
+    """
+    Writes the stored results back to the JSON files used before the database existed:
+    stats.json, <category>_frequencies.json and <method>_similarity.json
+    """
+    output_dir = Path(output_dir)
+    written = []
+    stats = load_stats(conn)
+    if stats:
+        written.append(output_dir / "stats.json")
+        with open(written[-1], "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+    for (category,) in conn.execute("SELECT DISTINCT category FROM keyword_hits").fetchall():
+        written.append(output_dir / f"{category.lower().replace(' ', '_')}_frequencies.json")
+        with open(written[-1], "w", encoding="utf-8") as f:
+            json.dump(load_keyword_hits(conn, category), f, indent=2)
+    for (method,) in conn.execute("SELECT DISTINCT method FROM similarity_pairs").fetchall():
+        written.append(output_dir / f"{method}_similarity.json")
+        with open(written[-1], "w", encoding="utf-8") as f:
+            json.dump(load_similarity_pairs(conn, method), f, indent=2)
+    return written
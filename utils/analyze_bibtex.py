@@ -1,5 +1,6 @@
 from pathlib import Path
 from collections import Counter, defaultdict
+from functools import lru_cache
 import re
 import json
 
@@ -18,29 +19,78 @@ def parse_bibtex_entries(path):
     entries = ["@" + e.strip() for e in entries if e.strip()]
     return entries
 
+@lru_cache(maxsize=None)
+def field_pattern(field_name):
+    """
+    Returns the compiled regex that locates the opening of a BibTeX field value
+    """
+    return re.compile(rf"{field_name}\s*=\s*([{{\"])", re.IGNORECASE)
+
 def extract_field(entry, field_name):
     """
-    Extracts the value of a specified BibTeX field using regex
-    Returns the content inside curly braces for that field
+    Extracts the value of a specified BibTeX field
+    Returns the content inside the field's outer curly braces (or quotes),
+    keeping nested braces such as LaTeX accents intact
     """
-    pattern = re.compile(rf"{field_name}\s*=\s*{{(.*?)}}", re.IGNORECASE | re.DOTALL)
-    match = pattern.search(entry)
-    return match.group(1).strip() if match else None
+    for match in field_pattern(field_name).finditer(entry):
+        # Skip longer field names that end with this one (e.g. 'booktitle' for 'title')
+        previous = entry[match.start() - 1] if match.start() else " "
+        if previous.isalnum() or previous in "_-":
+            continue
+        start = match.end()
+        if match.group(1) == '"':
+            end = entry.find('"', start)
+            return entry[start:end].strip() if end != -1 else None
+        depth = 1
+        for i in range(start, len(entry)):
+            if entry[i] == "{":
+                depth += 1
+            elif entry[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    return entry[start:i].strip()
+        return None
+    return None
 
-def analyze_entries(entries):
+def entity_label(index, kind, raw):
     """
-    Analyzes all BibTeX entries to collect statistics:
-    - Top 15 first authors
-    - Year of publication grouped by entry type
-    - Count by product type (article, inproceedings, etc)
-    - Top journals and top publishers
-    Returns a dictionary with all statistics
+    Maps a raw author/journal/publisher name to the stable key it is stored under in the entity index
+    Falls back to the raw name when there is no index or the name is not indexed
+    """
+    if not index:
+        return raw
+    return index[kind]["aliases"].get(raw, raw)
+
+def canonical_name(index, kind, raw):
+    """
+    Maps a raw name or an `entity_label` to the current display name of its entity
+    Falls back to the raw name when there is no index or the name is not indexed
+    """
+    if not index:
+        return raw
+    # Imported here: entity_index itself imports this module
+    from .entity_index import display_name
+    return display_name(index, kind, entity_label(index, kind, raw))
+
+def new_counters():
+    """
+    Returns empty counters for the statistics collected by `count_entries`
+    """
+    return {
+        "authors": Counter(),
+        "year_by_type": defaultdict(Counter),
+        "types": Counter(),
+        "journals": Counter(),
+        "publishers": Counter(),
+    }
+
+def count_entries(counters, entries, index=None):
+    """
+    Adds BibTeX entries to the statistics counters (see `new_counters`)
+    Names are counted under their stable `entity_label`, so counters can be updated
+    batch by batch (e.g. by the streaming pipeline) while display names change
+    Returns the updated counters
     """
-    author_counter = Counter()
-    year_type_counter = defaultdict(Counter)
-    type_counter = Counter()
-    journal_counter = Counter()
-    publisher_counter = Counter()
     for entry in entries:
         entry_type = entry.split("{", 1)[0].replace("@", "").strip().lower()
         year = extract_field(entry, "year")
@@ -51,26 +101,53 @@ def analyze_entries(entries):
         if authors_raw:
             authors = [a.strip() for a in authors_raw.split(" and ")]
             if authors:
-                author_counter[authors[0]] += 1  # first author only
+                counters["authors"][entity_label(index, "author", authors[0])] += 1  # first author only
         # Year by type
         if year:
-            year_type_counter[entry_type][year] += 1
+            counters["year_by_type"][entry_type][year] += 1
         # Product type
-        type_counter[entry_type] += 1
+        counters["types"][entry_type] += 1
         # Journal
         if journal:
-            journal_counter[journal] += 1
+            counters["journals"][entity_label(index, "journal", journal)] += 1
         # Publisher
         if publisher:
-            publisher_counter[publisher] += 1
+            counters["publishers"][entity_label(index, "publisher", publisher)] += 1
+    return counters
+
+def display_counts(counter, index, kind):
+    """
+    Merges counts kept per `entity_label` into counts per current display name
+    """
+    merged = Counter()
+    for label, count in counter.items():
+        merged[canonical_name(index, kind, label)] += count
+    return merged
+
+def summarize_counters(counters, index=None):
+    """
+    Turns statistics counters into the statistics dictionary (top 15 lists)
+    """
     return {
-        "top_authors": author_counter.most_common(15),
-        "year_by_type": dict(year_type_counter),
-        "types": type_counter,
-        "top_journals": journal_counter.most_common(15),
-        "top_publishers": publisher_counter.most_common(15),
+        "top_authors": display_counts(counters["authors"], index, "author").most_common(15),
+        "year_by_type": dict(counters["year_by_type"]),
+        "types": counters["types"],
+        "top_journals": display_counts(counters["journals"], index, "journal").most_common(15),
+        "top_publishers": display_counts(counters["publishers"], index, "publisher").most_common(15),
     }
 
+def analyze_entries(entries, index=None):
+    """
+    Analyzes all BibTeX entries to collect statistics:
+    - Top 15 first authors
+    - Year of publication grouped by entry type
+    - Count by product type (article, inproceedings, etc)
+    - Top journals and top publishers
+    If an entity index (see `entity_index.py`) is given, name variants are merged
+    Returns a dictionary with all statistics
+    """
+    return summarize_counters(count_entries(new_counters(), entries, index), index)
+
 def print_statistics(stats):
     """
     Prints the analysis results in a readable format
@@ -93,12 +170,12 @@ def print_statistics(stats):
     for p, count in stats["top_publishers"]:
         print(f"  {p}: {count}")
 
-def save_statistics(stats):
+def serialize_statistics(stats):
     """
-    Saves the statistics to a JSON file (`stats.json`) for further visualization
     Converts Counter and defaultdict objects to regular dictionaries for serialization
+    Returns the statistics in the `stats.json` layout
     """
-    serializable_stats = {
+    return {
         "top_authors": dict(stats["top_authors"]),
         "publication_year_by_type": {
             t: dict(y) for t, y in stats["year_by_type"].items()
@@ -107,20 +184,36 @@ def save_statistics(stats):
         "top_journals": dict(stats["top_journals"]),
         "top_publishers": dict(stats["top_publishers"]),
     }
+
+def save_statistics(stats):
+    """
+    Saves the statistics to a JSON file (`stats.json`) and to the analysis database
+    for further visualization
+    """
+    # Imported here: analysis_store itself imports this module
+    from .analysis_store import open_store, write_stats
+    serialized = serialize_statistics(stats)
     with open(STATS_OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(serializable_stats, f, indent=2)
+        json.dump(serialized, f, indent=2)
+    conn = open_store()
+    try:
+        write_stats(conn, serialized)
+    finally:
+        conn.close()
 
-def run_analysis():
+def run_analysis(index=None):
     """
     Main execution function:
     - Loads BibTeX entries from the merged file
     - Analyzes the entries for statistical information
     - Displays and stores the results
+    Returns the statistics in the `stats.json` layout
     """
     entries = parse_bibtex_entries(MERGED_PATH)
-    stats = analyze_entries(entries)
+    stats = analyze_entries(entries, index)
     print_statistics(stats)
     save_statistics(stats)
+    return serialize_statistics(stats)
 
 if __name__ == "__main__":
     run_analysis()
@@ -0,0 +1,170 @@
+from pathlib import Path
+from collections import defaultdict
+import json
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from .analyze_bibtex import parse_bibtex_entries, extract_field
+from .entity_index import (
+    split_authors, normalize_author, strip_latex, canonical_key, load_index, update_index, INDEX_PATH
+)
+
+# Paths
+MERGED_PATH = Path("data/processed/merged.bib")
+NETWORK_JSON_PATH = Path("data/processed/coauthorship_network.json")
+EDGES_PATH = Path("data/processed/coauthorship_edges.npy")
+
+# Binary edge list layout: node ids index the "node_names" list of the JSON export
+EDGE_DTYPE = np.dtype([("source", "<i4"), ("target", "<i4"), ("weight", "<f4")])
+
+def collect_author_lists(entries, index):
+    """
+    Extracts the authors of each entry as integer node ids
+    Authors are identified by their resolved entity in the entity index (see `entity_index.resolve`),
+    so "Jane Smith" and "John Smith" stay two nodes while "Smith, J." joins a compatible
+    full-name author only when it is the only one
+    Returns:
+        tuple: (author_lists, names) where author_lists is a list of id lists
+        and names maps node id -> display name
+    """
+    ids = {}
+    names = []
+    author_lists = []
+    for entry in entries:
+        paper = []
+        for raw in split_authors(extract_field(entry, "author")):
+            # Entries without a DOI/title key are not indexed; their authors fall back to the normalized name
+            key = canonical_key(index, "author", index["author"]["aliases"].get(raw) or normalize_author(raw))
+            if key not in ids:
+                ids[key] = len(names)
+                entity = index["author"]["entities"].get(key)
+                names.append(entity["name"] if entity else strip_latex(raw))
+            paper.append(ids[key])
+        # An author listed twice in the same entry is still a single node
+        author_lists.append(list(dict.fromkeys(paper)))
+    return author_lists, names
+
+def build_adjacency(author_lists, n_nodes):
+    """
+    Builds the symmetric co-authorship matrix in CSR format
+    Entry (i, j) is the number of papers co-authored by authors i and j
+    Pairs are generated per group of papers with the same number of authors
+    using vectorized upper-triangle indexing instead of nested loops
+    """
+    by_size = defaultdict(list)
+    for authors in author_lists:
+        if len(authors) > 1:
+            by_size[len(authors)].append(authors)
+    rows, cols = [], []
+    for size, papers in by_size.items():
+        block = np.asarray(papers, dtype=np.int32)
+        upper_i, upper_j = np.triu_indices(size, k=1)
+        rows.append(block[:, upper_i].ravel())
+        cols.append(block[:, upper_j].ravel())
+    if not rows:
+        return sparse.csr_matrix((n_nodes, n_nodes), dtype=np.float32)
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    weights = np.ones(len(rows), dtype=np.float32)
+    # Each pair is stored once in arbitrary orientation; adding the transpose symmetrizes it
+    pairs = sparse.coo_matrix((weights, (rows, cols)), shape=(n_nodes, n_nodes)).tocsr()
+    return (pairs + pairs.T).tocsr()
+
+def pagerank(adjacency, alpha=0.85, tol=1e-10, max_iter=100):
+    """
+    Computes weighted PageRank by power iteration with sparse matrix-vector products
+    Authors without co-authors (dangling nodes) redistribute their rank uniformly
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    strength = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = strength == 0
+    inv_strength = np.divide(1.0, strength, out=np.zeros_like(strength), where=~dangling)
+    transition_t = (sparse.diags(inv_strength) @ adjacency).T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        leaked = alpha * rank[dangling].sum() + (1 - alpha)
+        new_rank = alpha * (transition_t @ rank) + leaked / n
+        if np.abs(new_rank - rank).sum() < tol:
+            return new_rank
+        rank = new_rank
+    return rank
+
+def compute_metrics(adjacency):
+    """
+    Computes degree, weighted degree (strength), PageRank and connected components
+    Returns a dictionary of NumPy arrays indexed by node id
+    """
+    n_components, labels = connected_components(adjacency, directed=False)
+    return {
+        "degree": np.diff(adjacency.indptr),
+        "strength": np.asarray(adjacency.sum(axis=1)).ravel(),
+        "pagerank": pagerank(adjacency),
+        "n_components": n_components,
+        "component": labels,
+    }
+
+def top_nodes(values, names, n):
+    """
+    Returns the `n` nodes with the highest values as a {name: value} dictionary
+    """
+    if len(values) == 0:
+        return {}
+    n = min(n, len(values))
+    top = np.argpartition(-values, n - 1)[:n]
+    top = top[np.argsort(-values[top], kind="stable")]
+    return {names[i]: values[i].item() for i in top}
+
+def save_edge_list(adjacency, path=EDGES_PATH):
+    """
+    Saves each undirected edge once (source < target) as a binary NumPy structured array
+    """
+    upper = sparse.triu(adjacency, k=1).tocoo()
+    edges = np.empty(upper.nnz, dtype=EDGE_DTYPE)
+    edges["source"] = upper.row
+    edges["target"] = upper.col
+    edges["weight"] = upper.data
+    np.save(path, edges)
+
+def save_network_summary(adjacency, metrics, names, path=NETWORK_JSON_PATH, top_n=50):
+    """
+    Saves network statistics, the top authors per metric and the node names to JSON
+    """
+    component_sizes = np.bincount(metrics["component"]) if len(names) else np.zeros(0, dtype=int)
+    summary = {
+        "nodes": len(names),
+        "edges": int(sparse.triu(adjacency, k=1).nnz),
+        "components": int(metrics["n_components"]),
+        "largest_component": int(component_sizes.max()) if len(component_sizes) else 0,
+        "isolated_authors": int((metrics["degree"] == 0).sum()),
+        "top_degree": top_nodes(metrics["degree"], names, top_n),
+        "top_strength": top_nodes(metrics["strength"], names, top_n),
+        "top_pagerank": {k: round(v, 6) for k, v in top_nodes(metrics["pagerank"], names, top_n).items()},
+        "node_names": names,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+def run_coauthorship_network(bib_path=MERGED_PATH, json_path=NETWORK_JSON_PATH, edges_path=EDGES_PATH,
+                             index_path=INDEX_PATH):
+    """
+    Main pipeline to:
+    - Parse authors from the merged BibTeX file and resolve them with the entity index
+    - Build the sparse co-authorship network
+    - Compute degree, PageRank and connected components
+    - Export a JSON summary and a binary edge list
+    """
+    entries = parse_bibtex_entries(bib_path)
+    # Entries missing from the index are added in memory so every author has an alias
+    index = load_index(index_path)
+    update_index(index, entries)
+    author_lists, names = collect_author_lists(entries, index)
+    adjacency = build_adjacency(author_lists, len(names))
+    metrics = compute_metrics(adjacency)
+    summary = save_network_summary(adjacency, metrics, names, json_path)
+    save_edge_list(adjacency, edges_path)
+    print(f"Co-authorship network: {summary['nodes']} authors, {summary['edges']} edges, "
+          f"{summary['components']} components (largest: {summary['largest_component']})")
+    print(f"Saved to {json_path} and {edges_path}")
@@ -0,0 +1,365 @@
+from pathlib import Path
+from collections import Counter
+from difflib import SequenceMatcher
+import hashlib
+import json
+import re
+import unicodedata
+from .analyze_bibtex import parse_bibtex_entries, extract_field
+from .merge_bibtex_entries import extract_key
+
+# Paths
+MERGED_PATH = Path("data/processed/merged.bib")
+INDEX_PATH = Path("data/processed/entity_index.json")
+
+ENTITY_KINDS = ("author", "journal", "publisher")
+INDEX_VERSION = 3
+# Minimum similarity for two words of venue names to count as the same (mis)spelled word
+VENUE_WORD_RATIO = 0.85
+
+LATEX_ACCENT = re.compile(r"\\[`'^\"~=.uvHcdbtkr]\s*\{?\s*\\?([A-Za-z])\s*\}?")
+LATEX_COMMAND = re.compile(r"\\[A-Za-z]+\s*")
+# "and" is kept so that "Computers & Education" and "Computers in Education" stay apart
+VENUE_STOPWORDS = {"the", "of", "on", "in", "for", "a", "an"}
+# Words that may trail a venue name as part of a publisher address
+# ("association for computing machinery new york ny usa")
+ADDRESS_WORDS = {
+    "inc", "ltd", "llc", "co", "corp", "gmbh", "bv", "new", "york", "ny", "usa", "us", "uk", "united",
+    "states", "kingdom", "america", "nj", "ma", "ca", "piscataway", "los", "alamitos", "san", "francisco",
+    "boston", "washington", "dc", "london", "oxford", "cambridge", "amsterdam", "netherlands", "berlin",
+    "heidelberg", "germany", "cham", "switzerland", "singapore",
+}
+
+def strip_latex(text):
+    """
+    Converts LaTeX accents and commands into plain ASCII text
+    e.g. "Garc\\'{\\i}a" -> "Garcia"
+    """
+    text = LATEX_ACCENT.sub(r"\1", text)
+    text = LATEX_COMMAND.sub("", text)
+    text = text.replace("{", "").replace("}", "").replace("~", " ")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text).strip()
+
+def split_authors(authors_raw):
+    """
+    Splits a BibTeX author field into individual author names
+    """
+    if not authors_raw:
+        return []
+    return [a.strip() for a in re.split(r"\s+and\s+", authors_raw) if a.strip()]
+
+def normalize_author(raw):
+    """
+    Builds a normalized key for an author name as 'last|given'
+    The given part is the first given name when it is spelled out ("John Smith" -> "smith|john")
+    and only its initial otherwise ("Smith, J." and "J. A. Smith" -> "smith|j")
+    """
+    name = strip_latex(raw)
+    if "," in name:
+        last, first = name.split(",", 1)
+    else:
+        parts = name.split()
+        last, first = (parts[-1], " ".join(parts[:-1])) if parts else ("", "")
+    last = re.sub(r"[^a-z\- ]", "", last.lower()).strip()
+    first = [t.strip("-") for t in re.sub(r"[^a-z\- ]", " ", first.lower()).split()]
+    first = [t for t in first if t]
+    given = first[0] if first and len(first[0].replace("-", "")) > 1 else (first[0][0] if first else "")
+    return f"{last}|{given}"
+
+def is_initial_key(key):
+    """
+    Returns True if a normalized author key only holds the initial of the given name
+    """
+    return len(key.split("|", 1)[1]) <= 1
+
+def normalize_venue(raw):
+    """
+    Builds a normalized key for a journal or publisher name
+    Lowercases, removes punctuation and stopwords, and replaces '&' with 'and'
+    Single letters after the first word are kept, as they name series sections ("Physics A")
+    """
+    name = strip_latex(raw).lower().replace("&", " and ")
+    tokens = re.sub(r"[^a-z0-9 ]", " ", name).split()
+    return " ".join(
+        t for position, t in enumerate(tokens)
+        if t not in VENUE_STOPWORDS or (position > 0 and len(t) == 1)
+    )
+
+def normalize_name(kind, raw):
+    """
+    Dispatches to the normalizer for the given entity kind
+    """
+    return normalize_author(raw) if kind == "author" else normalize_venue(raw)
+
+def block_key(kind, key):
+    """
+    Hashes the blocking token of a normalized key into a short bucket id
+    Authors are blocked by last name, venues by the first four letters of their
+    first significant word so abbreviations ("Commun.") share a block with the full name
+    """
+    if kind == "author":
+        token = key.split("|", 1)[0]
+    else:
+        words = key.split()
+        token = words[0][:4] if words else key
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=4).hexdigest()
+
+def empty_index():
+    """
+    Returns a new, empty entity index
+    """
+    return {
+        "version": INDEX_VERSION,
+        "entries": {},
+        **{kind: {"blocks": {}, "aliases": {}, "entities": {}} for kind in ENTITY_KINDS},
+    }
+
+def load_index(path=INDEX_PATH):
+    """
+    Loads the entity index from disk or returns an empty one if missing or outdated
+    """
+    path = Path(path)
+    if not path.exists():
+        return empty_index()
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        return empty_index()
+    return index
+
+def save_index(index, path=INDEX_PATH):
+    """
+    Saves the entity index as JSON
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+def same_venue_word(x, y):
+    """
+    Decides whether two words of normalized venue names match:
+    one abbreviates the other ("commun" / "communications") or they are near-identical spellings
+    """
+    if x.startswith(y) or y.startswith(x):
+        return True
+    return min(len(x), len(y)) >= 5 and SequenceMatcher(None, x, y).ratio() >= VENUE_WORD_RATIO
+
+def is_venue_alias(a, b):
+    """
+    Decides whether two normalized venue keys name the same venue
+    Matches word-by-word abbreviations ("commun acm" / "communications acm"), misspelled
+    words and trailing publisher addresses ("association computing machinery new york ny usa")
+    Names with different numbers (editions, years, volumes) or section letters are never aliases
+    """
+    tokens_a, tokens_b = a.split(), b.split()
+    if [t for t in tokens_a if any(c.isdigit() for c in t)] != [t for t in tokens_b if any(c.isdigit() for c in t)]:
+        return False
+    if len(tokens_a) == len(tokens_b):
+        return all(same_venue_word(x, y) for x, y in zip(tokens_a, tokens_b))
+    shorter, longer = sorted((tokens_a, tokens_b), key=len)
+    return bool(shorter) and longer[:len(shorter)] == shorter and all(t in ADDRESS_WORDS for t in longer[len(shorter):])
+
+def author_candidates(table, key):
+    """
+    Returns the full-name authors in the last-name block of an initial-only key
+    whose given name starts with that initial
+    """
+    last, initial = key.split("|", 1)
+    return [
+        candidate for candidate in table["blocks"].get(block_key("author", key), [])
+        if not is_initial_key(candidate)
+        and candidate.split("|", 1)[0] == last
+        and candidate.split("|", 1)[1].startswith(initial)
+    ]
+
+def entity_key(index, kind, raw):
+    """
+    Returns the key of the entity a raw name is stored under, or None if it is not indexed
+    Checks the alias table first, then the exact normalized key and, for venues,
+    abbreviated or near-identical names inside the same hash block
+    Authors are stored under their exact 'last|given' key, so initial-only forms
+    ("Smith, J.") keep an entity of their own (see `canonical_key`)
+    """
+    table = index[kind]
+    if raw in table["aliases"]:
+        return table["aliases"][raw]
+    key = normalize_name(kind, raw)
+    if key in table["entities"]:
+        return key
+    if kind == "author":
+        return None
+    for candidate in table["blocks"].get(block_key(kind, key), []):
+        if is_venue_alias(key, candidate):
+            return candidate
+    return None
+
+def canonical_key(index, kind, key):
+    """
+    Maps a stored entity key to the entity it is reported under
+    An initial-only author ("smith|j") is reported as the full-name author of its
+    last-name block only while exactly one compatible one exists ("smith|john");
+    this is decided on every call, so the result does not depend on indexing order
+    """
+    if kind != "author" or not is_initial_key(key):
+        return key
+    candidates = author_candidates(index[kind], key)
+    return candidates[0] if len(candidates) == 1 else key
+
+def resolve(index, kind, raw):
+    """
+    Resolves a raw name to the canonical key of an existing entity
+    Returns None if no entity matches
+    """
+    key = entity_key(index, kind, raw)
+    if key is None and kind == "author":
+        key = normalize_author(raw)
+    key = canonical_key(index, kind, key)
+    return key if key in index[kind]["entities"] else None
+
+def display_name(index, kind, key):
+    """
+    Returns the display name of the canonical entity of a stored key
+    Keys that are not indexed (e.g. raw names) are returned unchanged
+    """
+    entities = index[kind]["entities"]
+    if key not in entities:
+        return key
+    return entities[canonical_key(index, kind, key)]["name"]
+
+def add_mention(index, kind, raw, entry_key):
+    """
+    Records that the entity named `raw` appears in the given entry
+    Creates the entity and its block membership if it does not exist yet
+    """
+    table = index[kind]
+    key = entity_key(index, kind, raw)
+    if key is None:
+        key = normalize_name(kind, raw)
+        table["entities"][key] = {"name": strip_latex(raw), "variants": {}, "entries": []}
+        table["blocks"].setdefault(block_key(kind, key), []).append(key)
+    entity = table["entities"][key]
+    table["aliases"][raw] = key
+    entity["variants"][raw] = entity["variants"].get(raw, 0) + 1
+    # The most frequent spelling becomes the display name
+    top_variant = max(entity["variants"].items(), key=lambda kv: kv[1])[0]
+    entity["name"] = strip_latex(top_variant)
+    # Entries are indexed one at a time, so a repeated mention can only be the last entry
+    if not entity["entries"] or entity["entries"][-1] != entry_key:
+        entity["entries"].append(entry_key)
+
+def update_index(index, entries):
+    """
+    Adds new BibTeX entries to the index
+    Entries whose deduplication key is already indexed are skipped,
+    so re-running after a merge only processes newly merged entries
+    Returns the number of entries added
+    """
+    added = 0
+    for entry in entries:
+        entry_key = extract_key(entry)
+        if not entry_key or entry_key in index["entries"]:
+            continue
+        entry_type = entry.split("{", 1)[0].replace("@", "").strip().lower()
+        year = extract_field(entry, "year")
+        title = extract_field(entry, "title")
+        index["entries"][entry_key] = {
+            "type": entry_type,
+            "year": year.strip() if year else None,
+            "title": strip_latex(title) if title else None,
+        }
+        for position, author in enumerate(split_authors(extract_field(entry, "author"))):
+            add_mention(index, "author", author, entry_key)
+            if position == 0:
+                index["entries"][entry_key]["first_author"] = index["author"]["aliases"][author]
+        for kind in ("journal", "publisher"):
+            value = extract_field(entry, kind)
+            if value:
+                add_mention(index, kind, value, entry_key)
+        added += 1
+    return added
+
+def merged_keys(index, kind, key):
+    """
+    Returns the stored keys reported under a canonical key: the key itself and,
+    for a full-name author, the initial-only entities that resolve to it
+    """
+    if kind != "author" or is_initial_key(key):
+        return [key]
+    return [key] + [
+        other for other in index[kind]["blocks"].get(block_key(kind, key), [])
+        if other != key and is_initial_key(other) and canonical_key(index, kind, other) == key
+    ]
+
+def lookup(index, kind, name):
+    """
+    Returns the entity record for a name in any spelling, or None if unknown
+    Initial-only variants that resolve to the entity are merged into the record
+    """
+    key = resolve(index, kind, name)
+    if not key:
+        return None
+    entities = index[kind]["entities"]
+    keys = merged_keys(index, kind, key)
+    if len(keys) == 1:
+        return entities[key]
+    variants = Counter()
+    for k in keys:
+        variants.update(entities[k]["variants"])
+    entries = list(dict.fromkeys(e for k in keys for e in entities[k]["entries"]))
+    return {"name": entities[key]["name"], "variants": dict(variants), "entries": entries}
+
+def publications(index, kind, name):
+    """
+    Lists the entries (with type, year and title) linked to an author or venue
+    """
+    entity = lookup(index, kind, name)
+    if not entity:
+        return []
+    return [{"key": k, **index["entries"][k]} for k in entity["entries"] if k in index["entries"]]
+
+def counts_by_year(index, kind, name):
+    """
+    Counts the publications of an author or venue per year
+    """
+    counter = Counter()
+    for pub in publications(index, kind, name):
+        if pub["year"]:
+            counter[pub["year"]] += 1
+    return dict(sorted(counter.items()))
+
+def top_entities(index, kind, n=15, first_author_only=False):
+    """
+    Returns the `n` entities with most publications as (display name, count) tuples
+    With `first_author_only` only first-author credits are counted, as in `analyze_bibtex`
+    """
+    counter = Counter()
+    if kind == "author" and first_author_only:
+        for record in index["entries"].values():
+            if record.get("first_author"):
+                counter[canonical_key(index, kind, record["first_author"])] += 1
+    else:
+        entries = {}
+        for k, e in index[kind]["entities"].items():
+            entries.setdefault(canonical_key(index, kind, k), set()).update(e["entries"])
+        counter.update({k: len(e) for k, e in entries.items()})
+    entities = index[kind]["entities"]
+    return [(entities[k]["name"], count) for k, count in counter.most_common(n)]
+
+def update_entity_index(bib_path=MERGED_PATH, index_path=INDEX_PATH):
+    """
+    Main function to:
+    - Load the existing index (if any)
+    - Add entries from the merged BibTeX file that are not indexed yet
+    - Save the updated index
+    Returns the updated index
+    """
+    index = load_index(index_path)
+    added = update_index(index, parse_bibtex_entries(bib_path))
+    save_index(index, index_path)
+    totals = ", ".join(f"{len(index[k]['entities'])} {k}s" for k in ENTITY_KINDS)
+    print(f"Entity index: {added} new entries ({totals})")
+    return index
+
+if __name__ == "__main__":
+    update_entity_index()
@@ -1,6 +1,7 @@
 import json
 import matplotlib.pyplot as plt
 from pathlib import Path
+from .analysis_store import open_store, store_exists, load_stats as load_stored_stats
 
 # Paths
 STATS_PATH = Path("data/processed/stats.json")
@@ -9,9 +10,17 @@ FIGURES_DIR.mkdir(exist_ok=True)
 
 def load_stats():
     """
-    Loads precomputed statistics from the `stats.json` file
+    Loads precomputed statistics from the analysis database, falling back to `stats.json`
     Returns a dictionary with all required metrics for plotting
     """
+    if store_exists():
+        conn = open_store()
+        try:
+            stats = load_stored_stats(conn)
+        finally:
+            conn.close()
+        if stats:
+            return stats
     with open(STATS_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -1,8 +1,7 @@
 from typing import Union
 from pathlib import Path
-from .keyword_visualization import generate_wordcloud, draw_cooccurrence_graph
+import json
 import re
-import networkx as nx
 
 def parse_bibtex_abstracts(path: Path) -> list[str]:
     """
@@ -11,13 +10,15 @@ def parse_bibtex_abstracts(path: Path) -> list[str]:
     with open(path, "r", encoding="utf-8") as f:
         content = f.read()
     entries = content.split("\n@")
-    abstracts = []
-    for entry in entries:
-        match = re.search(r"abstract\s*=\s*[{\"](.+?)[}\"]\s*,?", entry, re.IGNORECASE | re.DOTALL)
-        if match:
-            abstract = match.group(1).replace("\n", " ").lower()
-            abstracts.append(abstract)
-    return abstracts
+    return [a for a in map(extract_abstract, entries) if a is not None]
+
+def extract_abstract(entry: str):
+    """
+    Returns the lowercased abstract of one BibTeX entry as used for keyword counting, or None
+    Shared by the batch keyword analysis and the streaming pipeline so both count the same text
+    """
+    match = re.search(r"abstract\s*=\s*[{\"](.+?)[}\"]\s*,?", entry, re.IGNORECASE | re.DOTALL)
+    return match.group(1).replace("\n", " ").lower() if match else None
 
 def parse_keywords(raw_keywords: list[str]) -> dict:
     """
@@ -46,6 +47,7 @@ def build_graph_with_synonyms(abstracts: list[str], keyword_map: dict):
     """
     Builds co-occurrence graph using canonical keywords, considering synonyms
     """
+    import networkx as nx
     G = nx.Graph()
     canonicals = list(keyword_map.keys())
     for keyword in canonicals:
@@ -64,30 +66,50 @@ def build_graph_with_synonyms(abstracts: list[str], keyword_map: dict):
                     G.add_edge(u, v, weight=1)
     return G
 
-def analyze_keyword_category(
+def build_keyword_category(
     raw_keywords: list[str],
     category_name: str,
     abstracts: list[str],
     json_output_dir: Union[str, Path],
     figure_output_dir: Union[str, Path]
-):
+) -> dict:
     """
-    Performs full analysis for a keyword category:
+    Computes the data of a keyword category and saves its frequencies JSON:
     - Parses synonyms
     - Counts frequencies
-    - Builds and draws co-occurrence graph
-    - Saves JSON and figures
+    - Builds co-occurrence graph
+    Returns a render job for `keyword_visualization.render_keyword_figures`
     """
     category_slug = category_name.lower().replace(" ", "_")
     keyword_map = parse_keywords(raw_keywords)
     freq_counter = count_keywords_with_synonyms(abstracts, keyword_map)
     graph = build_graph_with_synonyms(abstracts, keyword_map)
     json_path = Path(json_output_dir) / f"{category_slug}_frequencies.json"
-    wordcloud_path = Path(figure_output_dir) / f"{category_slug}_wordcloud.png"
-    graph_path = Path(figure_output_dir) / f"{category_slug}_cooccurrence.png"
     with open(json_path, "w", encoding="utf-8") as f:
-        import json
         json.dump(freq_counter, f, indent=2)
-    generate_wordcloud(freq_counter, wordcloud_path)
-    draw_cooccurrence_graph(graph, graph_path, title=category_name)
+    return {
+        "title": category_name,
+        "frequencies": freq_counter,
+        "graph": graph,
+        "wordcloud_path": Path(figure_output_dir) / f"{category_slug}_wordcloud.png",
+        "graph_path": Path(figure_output_dir) / f"{category_slug}_cooccurrence.png",
+    }
+
+def analyze_keyword_category(
+    raw_keywords: list[str],
+    category_name: str,
+    abstracts: list[str],
+    json_output_dir: Union[str, Path],
+    figure_output_dir: Union[str, Path]
+):
+    """
+    Performs full analysis for a keyword category:
+    - Parses synonyms
+    - Counts frequencies
+    - Builds and draws co-occurrence graph
+    - Saves JSON and figures
+    """
+    from .keyword_visualization import render_keyword_figures
+    job = build_keyword_category(raw_keywords, category_name, abstracts, json_output_dir, figure_output_dir)
+    render_keyword_figures([job])
     print(f"{category_name} analysis saved in '{figure_output_dir}' and '{json_output_dir}'")
@@ -1,8 +1,32 @@
 from wordcloud import WordCloud
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import networkx as nx
-from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
 from pathlib import Path
+import hashlib
+import json
+
+# Caches shared across runs
+LAYOUT_CACHE_PATH = Path("data/processed/layout_cache.json")
+FIGURE_MANIFEST_PATH = Path("data/processed/figure_manifest.json")
+
+# Word cloud settings shared by every category (font_path=None uses the bundled font)
+WORDCLOUD_SETTINGS = {"width": 1000, "height": 600, "background_color": "white", "font_path": None, "mask": None}
+
+# One WordCloud per process: font and mask setup is done once and reused for all categories
+_wordcloud = None
+
+def get_wordcloud() -> WordCloud:
+    """
+    Returns the process-wide WordCloud instance, creating it on first use
+    """
+    global _wordcloud
+    if _wordcloud is None:
+        _wordcloud = WordCloud(**WORDCLOUD_SETTINGS)
+    return _wordcloud
 
 def generate_wordcloud(counter, output_path: Union[str, Path]):
     """
@@ -12,19 +36,63 @@ def generate_wordcloud(counter, output_path: Union[str, Path]):
     if not filtered:
         print("X Skipping word cloud: no keywords with frequency > 0")
         return
-    wc = WordCloud(width=1000, height=600, background_color="white")
+    wc = get_wordcloud()
     wc.generate_from_frequencies(counter)
     wc.to_file(str(output_path))
 
-def draw_cooccurrence_graph(G: nx.Graph, output_path: Union[str, Path], title: str = "Keyword Co-occurrence Network"):
+def graph_fingerprint(G: nx.Graph, **params) -> str:
+    """
+    Hashes the node set, the weighted edges and the layout parameters of a graph
+    """
+    edges = sorted((min(u, v), max(u, v), float(d.get("weight", 1))) for u, v, d in G.edges(data=True))
+    payload = json.dumps([sorted(G.nodes()), edges, params], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def load_json_cache(path: Path) -> dict:
+    """
+    Loads a JSON cache file, returning an empty dict if it does not exist
+    """
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_json_cache(cache: dict, path: Path):
+    """
+    Saves a JSON cache file
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+def layout_key(G: nx.Graph, k: float = 0.5, seed: int = 42) -> str:
+    """
+    Returns the layout cache key of a graph drawn with the given spring layout parameters
+    """
+    return graph_fingerprint(G, k=k, seed=seed)
+
+def cached_spring_layout(G: nx.Graph, cache: dict, k: float = 0.5, seed: int = 42) -> dict:
+    """
+    Returns the spring layout of a graph, reusing a cached one when the
+    node set, edge weights and parameters are unchanged
+    """
+    key = layout_key(G, k=k, seed=seed)
+    if key not in cache:
+        pos = nx.spring_layout(G, k=k, seed=seed)
+        cache[key] = {node: [float(x), float(y)] for node, (x, y) in pos.items()}
+    return {node: tuple(xy) for node, xy in cache[key].items()}
+
+def draw_cooccurrence_graph(G: nx.Graph, output_path: Union[str, Path], title: str = "Keyword Co-occurrence Network",
+                            pos: Optional[dict] = None):
     """
     Draws and saves a co-occurrence network graph of keywords
+    A precomputed layout can be passed with `pos`
     """
     if G.number_of_edges() == 0:
         print("X Skipping co-occurrence graph: no edges found")
         return
     plt.figure(figsize=(12, 8))
-    pos = nx.spring_layout(G, k=0.5, seed=42)
+    if pos is None:
+        pos = nx.spring_layout(G, k=0.5, seed=42)
     edges = list(G.edges(data=True))
     edgelist = [(u, v) for u, v, _ in edges]
     weights = [float(data.get("weight", 1)) for _, _, data in edges]
@@ -39,3 +107,62 @@ def draw_cooccurrence_graph(G: nx.Graph, output_path: Union[str, Path], title: s
     plt.savefig(str(output_path))
     plt.close()
 
+def render_category(job: dict):
+    """
+    Renders the word cloud and co-occurrence graph of one keyword category
+    Runs inside a worker process, so the job only holds plain data
+    """
+    G = nx.Graph()
+    G.add_nodes_from(job["nodes"])
+    G.add_weighted_edges_from(job["edges"])
+    generate_wordcloud(job["frequencies"], job["wordcloud_path"])
+    draw_cooccurrence_graph(G, job["graph_path"], title=job["title"], pos=job["pos"])
+    return job["title"]
+
+def render_keyword_figures(jobs: list[dict], workers: Optional[int] = None, force: bool = False):
+    """
+    Renders the figures of many keyword categories in one batch
+    Each job holds: title, frequencies, graph (nx.Graph), wordcloud_path and graph_path
+    - Layouts are taken from the layout cache when the graph is unchanged
+    - Categories whose frequencies and graph did not change since the last run are skipped
+    - The remaining categories are rendered in parallel worker processes
+    - Layouts of graphs that are not part of this batch are dropped from the cache
+    """
+    layout_cache = load_json_cache(LAYOUT_CACHE_PATH)
+    manifest = load_json_cache(FIGURE_MANIFEST_PATH)
+    pending = []
+    used_layouts = set()
+    for job in jobs:
+        G = job["graph"]
+        if G.number_of_edges():
+            used_layouts.add(layout_key(G))
+        fingerprint = hashlib.sha1(json.dumps(
+            [job["frequencies"], graph_fingerprint(G), WORDCLOUD_SETTINGS["width"], WORDCLOUD_SETTINGS["height"]],
+            sort_keys=True
+        ).encode("utf-8")).hexdigest()
+        outputs_exist = Path(job["wordcloud_path"]).exists() or not any(v > 0 for v in job["frequencies"].values())
+        outputs_exist = outputs_exist and (Path(job["graph_path"]).exists() or G.number_of_edges() == 0)
+        if not force and manifest.get(str(job["graph_path"])) == fingerprint and outputs_exist:
+            print(f"{job['title']}: figures up to date, skipping")
+            continue
+        manifest[str(job["graph_path"])] = fingerprint
+        pending.append({
+            "title": job["title"],
+            "frequencies": job["frequencies"],
+            "nodes": list(G.nodes()),
+            "edges": [(u, v, d.get("weight", 1)) for u, v, d in G.edges(data=True)],
+            "pos": cached_spring_layout(G, layout_cache) if G.number_of_edges() else None,
+            "wordcloud_path": str(job["wordcloud_path"]),
+            "graph_path": str(job["graph_path"]),
+        })
+    if workers == 1 or len(pending) < 2:
+        for job in pending:
+            print(f"{render_category(job)}: figures rendered")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for title in pool.map(render_category, pending):
+                print(f"{title}: figures rendered")
+    layout_cache = {key: pos for key, pos in layout_cache.items() if key in used_layouts}
+    save_json_cache(layout_cache, LAYOUT_CACHE_PATH)
+    save_json_cache(manifest, FIGURE_MANIFEST_PATH)
+    return len(pending)
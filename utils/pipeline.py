@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import json
+import shutil
+from array import array
+from pathlib import Path
+import numpy as np
+from scipy import sparse
+from .merge_bibtex_entries import split_bib_entries, extract_key, PROCESSED_DIR, RAW_DIR
+from .raw_ingest import read_entries
+from .entity_index import load_index, save_index, update_index, INDEX_PATH
+from .trend_store import update_trend_store
+from .keyword_analysis import parse_keywords, count_keywords_with_synonyms, extract_abstract
+from .analyze_bibtex import new_counters, count_entries, summarize_counters, save_statistics
+from .similarity_jaccard import entry_abstract, append_token_rows
+from .analysis_store import (
+    open_store, write_entries, write_keyword_hits, write_similarity_pairs, add_similarity_pairs, entry_rows
+)
+
+# Paths
+MERGED_PATH = PROCESSED_DIR / "merged.bib"
+DUPLICATES_PATH = PROCESSED_DIR / "duplicates.bib"
+# Written on demand by 'export-json' from the pairs stored under STREAM_METHOD
+STREAM_SIMILARITY_PATH = PROCESSED_DIR / "stream_jaccard_similarity.json"
+# Method name of the new-vs-existing pairs in the analysis database
+STREAM_METHOD = "stream_jaccard"
+DROP_DIR = Path("data/incoming")
+
+# Queue sizes bound memory use when the producer is faster than the analysis
+FILE_QUEUE_SIZE = 8
+ENTRY_QUEUE_SIZE = 1000
+BATCH_SIZE = 200
+# Queued by the ingest stage after the last entry of a file: (FILE_DONE, path)
+FILE_DONE = object()
+
+async def scrape_source(pages, files_q):
+    """
+    Producer that scrapes ACM result pages one by one and queues each downloaded file
+    The blocking Selenium scraper runs in a worker thread
+    """
+    from scrapers.acm_scraper import scrape_acm_bibtex
+    for page in pages:
+        path = await asyncio.to_thread(scrape_acm_bibtex, page, False)
+        if path:
+            await files_q.put(Path(path))
+    await files_q.put(None)
+
+async def file_drop_source(drop_dir, files_q, poll_interval=1.0, idle_timeout=10.0):
+    """
+    Producer that watches a directory and queues every new .bib file dropped into it
+    Stands in for the live scraper; stops after `idle_timeout` seconds without new files
+    A file is only queued once its size is stable between two polls
+    """
+    drop_dir = Path(drop_dir)
+    drop_dir.mkdir(parents=True, exist_ok=True)
+    seen, sizes = set(), {}
+    idle = 0.0
+    while idle < idle_timeout:
+        found = False
+        for path in sorted(drop_dir.glob("*.bib")):
+            if path in seen:
+                continue
+            size = path.stat().st_size
+            if sizes.get(path) == size:
+                seen.add(path)
+                await files_q.put(path)
+                found = True
+            sizes[path] = size
+        idle = 0.0 if found or len(sizes) > len(seen) else idle + poll_interval
+        await asyncio.sleep(poll_interval)
+    await files_q.put(None)
+
+async def ingest_stage(files_q, entries_q):
+    """
+    Splits each incoming file into (key, entry) pairs using the mmap scanner
+    A (FILE_DONE, path) item follows the last entry of every file
+    """
+    while (path := await files_q.get()) is not None:
+        records = await asyncio.to_thread(read_entries, path)
+        for key, entry in records:
+            await entries_q.put((key, entry))
+        await entries_q.put((FILE_DONE, path))
+        print(f"[pipeline] ingested {len(records)} entries from {path.name}")
+    await entries_q.put(None)
+
+def archive_raw_file(path):
+    """
+    Moves a dropped file into data/raw so later batch merges include it
+    A raw file with the same name is never overwritten: the dropped file gets a content-hash
+    suffix instead, and is simply removed if the same content is already archived
+    Returns the archived path
+    """
+    path = Path(path)
+    if path.parent.resolve() == RAW_DIR.resolve():
+        return path
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    target = RAW_DIR / path.name
+    if target.exists():
+        content = path.read_bytes()
+        if target.read_bytes() == content:
+            path.unlink()
+            return target
+        digest = hashlib.sha1(content).hexdigest()[:10]
+        target = RAW_DIR / f"{path.stem}_{digest}{path.suffix}"
+        if target.exists():
+            path.unlink()
+            return target
+    shutil.move(str(path), target)
+    return target
+
+async def merge_stage(entries_q, batches_q, seen):
+    """
+    Deduplicates incoming entries against everything merged so far
+    New entries are appended to merged.bib and forwarded in batches for analysis
+    A source file is archived only once all of its entries are written to merged.bib
+    """
+    batch = []
+    with open(MERGED_PATH, "a", encoding="utf-8") as merged, open(DUPLICATES_PATH, "a", encoding="utf-8") as duplicates:
+        while (item := await entries_q.get()) is not None:
+            key, entry = item
+            if key is FILE_DONE:
+                merged.flush()
+                duplicates.flush()
+                target = await asyncio.to_thread(archive_raw_file, entry)
+                if target.name != entry.name:
+                    print(f"[pipeline] {entry.name} archived as {target.name} (name already in {RAW_DIR})")
+                continue
+            if key in seen:
+                duplicates.write(entry + "\n\n")
+                continue
+            seen.add(key)
+            merged.write(entry + "\n\n")
+            batch.append(entry)
+            if len(batch) >= BATCH_SIZE or entries_q.empty():
+                merged.flush()
+                duplicates.flush()
+                await batches_q.put(batch)
+                batch = []
+    if batch:
+        await batches_q.put(batch)
+    await batches_q.put(None)
+
+def add_abstract_rows(state, entries):
+    """
+    Appends the abstract word sets of entries to the running sparse word matrix
+    Abstracts are extracted exactly as in the batch Jaccard module
+    Returns the number of rows added
+    """
+    abstracts = list(filter(None, map(entry_abstract, entries)))
+    append_token_rows(state["vocabulary"], state["indices"], state["indptr"], (a for _, a in abstracts))
+    state["row_keys"].extend(key for key, _ in abstracts)
+    return len(abstracts)
+
+def stream_jaccard_pairs(state, n_new):
+    """
+    Scores the last `n_new` rows of the word matrix against every earlier row with one
+    sparse product and returns the pairs with similarity >= the pipeline threshold
+    """
+    if not n_new:
+        return []
+    indptr = np.frombuffer(state["indptr"], dtype=np.int64)
+    indices = np.frombuffer(state["indices"], dtype=np.int32)
+    n_rows, first_new = len(indptr) - 1, len(indptr) - 1 - n_new
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(n_rows, len(state["vocabulary"])),
+    )
+    intersection = (matrix[first_new:] @ matrix.T).tocoo()
+    del matrix
+    rows, cols, shared = intersection.row + first_new, intersection.col, intersection.data
+    # Each new abstract is compared with the abstracts seen before it (including earlier new ones)
+    earlier = cols < rows
+    rows, cols, shared = rows[earlier], cols[earlier], shared[earlier]
+    sizes = np.diff(indptr)
+    sims = shared / (sizes[rows] + sizes[cols] - shared)
+    keep = np.nonzero(sims >= state["threshold"])[0]
+    keys = state["row_keys"]
+    return [
+        {"source": keys[j], "target": keys[i], "similarity": round(float(sim), 4)}
+        for i, j, sim in zip(rows[keep], cols[keep], sims[keep]) if keys[i] != keys[j]
+    ]
+
+def init_analysis_state(existing_entries, categories, threshold=0.4):
+    """
+    Builds the running analysis state from the entries merged before the pipeline started:
+    entity index, year-partitioned trends, statistics counters, keyword counts and the
+    sparse word matrix of the abstracts
+    """
+    keyword_maps = {name: parse_keywords(raw) for name, raw in categories.items()}
+    index = load_index()
+    update_index(index, existing_entries)
+    update_trend_store(existing_entries, categories, index)
+    abstracts = [a for a in map(extract_abstract, existing_entries) if a is not None]
+    # Stream pairs only cover the current run
+    conn = open_store()
+    try:
+        write_similarity_pairs(conn, STREAM_METHOD, [])
+    finally:
+        conn.close()
+    STREAM_SIMILARITY_PATH.unlink(missing_ok=True)
+    state = {
+        "categories": categories,
+        "threshold": threshold,
+        "keyword_maps": keyword_maps,
+        "index": index,
+        "stats": count_entries(new_counters(), existing_entries, index),
+        "keyword_counts": {
+            name: count_keywords_with_synonyms(abstracts, keyword_map)
+            for name, keyword_map in keyword_maps.items()
+        },
+        # Binary abstract x word matrix in CSR form, grown batch by batch
+        "vocabulary": {},
+        "indices": array("i"),
+        "indptr": array("q", [0]),
+        "row_keys": [],
+    }
+    add_abstract_rows(state, existing_entries)
+    return state
+
+def process_batch(state, entries):
+    """
+    Updates every aggregate with a batch of new entries (runs in a worker thread)
+    New abstracts are compared by Jaccard similarity against all abstracts seen so far
+    Returns:
+        tuple: (updated years, number of new similar pairs)
+    """
+    update_index(state["index"], entries)
+    years = update_trend_store(entries, state["categories"], state["index"])
+    count_entries(state["stats"], entries, state["index"])
+    abstracts = [a for a in map(extract_abstract, entries) if a is not None]
+    for name, keyword_map in state["keyword_maps"].items():
+        for keyword, count in count_keywords_with_synonyms(abstracts, keyword_map).items():
+            state["keyword_counts"][name][keyword] += count
+    pairs = stream_jaccard_pairs(state, add_abstract_rows(state, entries))
+    # sqlite connections are bound to their thread, so each batch opens its own
+    conn = open_store()
+    try:
+        write_entries(conn, entry_rows(entries))
+        add_similarity_pairs(conn, STREAM_METHOD, pairs)
+    finally:
+        conn.close()
+    save_analysis_state(state)
+    return years, len(pairs)
+
+def save_analysis_state(state):
+    """
+    Writes the current results so they are visible while the harvest continues
+    """
+    save_index(state["index"], INDEX_PATH)
+    save_statistics(summarize_counters(state["stats"], state["index"]))
+    conn = open_store()
+    try:
+        for name, counts in state["keyword_counts"].items():
+            write_keyword_hits(conn, name, counts)
+    finally:
+        conn.close()
+    for name, counts in state["keyword_counts"].items():
+        slug = name.lower().replace(" ", "_")
+        with open(PROCESSED_DIR / f"{slug}_frequencies.json", "w", encoding="utf-8") as f:
+            json.dump(counts, f, indent=2)
+
+async def analysis_stage(batches_q, state):
+    """
+    Consumes batches of new entries and updates the running analysis
+    """
+    total = 0
+    while (batch := await batches_q.get()) is not None:
+        years, new_pairs = await asyncio.to_thread(process_batch, state, batch)
+        total += len(batch)
+        print(f"[pipeline] +{len(batch)} entries (total {total}), years {', '.join(years) or '-'}, "
+              f"{new_pairs} new similar pairs")
+    return total
+
+def load_merged_entries():
+    """
+    Returns the entries already in merged.bib
+    """
+    if not MERGED_PATH.exists():
+        return []
+    with open(MERGED_PATH, "r", encoding="utf-8") as f:
+        return split_bib_entries(f.read())
+
+async def run_pipeline(source, categories, threshold=0.4):
+    """
+    Runs the streaming pipeline:
+    source -> ingest -> merge/dedup -> analysis, connected by bounded queues
+    Args:
+        source: coroutine function taking the file queue (e.g. `file_drop_source`)
+        categories (dict): keyword categories (see `main.py`)
+        threshold (float): Jaccard threshold for new-vs-existing similarity
+    """
+    existing = load_merged_entries()
+    seen = {extract_key(e) for e in existing}
+    print(f"[pipeline] starting with {len(existing)} merged entries")
+    state = await asyncio.to_thread(init_analysis_state, existing, categories, threshold)
+    files_q = asyncio.Queue(maxsize=FILE_QUEUE_SIZE)
+    entries_q = asyncio.Queue(maxsize=ENTRY_QUEUE_SIZE)
+    batches_q = asyncio.Queue(maxsize=4)
+    _, _, _, total = await asyncio.gather(
+        source(files_q),
+        ingest_stage(files_q, entries_q),
+        merge_stage(entries_q, batches_q, seen),
+        analysis_stage(batches_q, state),
+    )
+    print(f"[pipeline] done: {total} new entries merged and analyzed")
+    print(f"[pipeline] new-vs-existing pairs are stored as '{STREAM_METHOD}'; "
+          f"run 'export-json' to write {STREAM_SIMILARITY_PATH.name}")
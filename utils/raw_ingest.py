@@ -0,0 +1,146 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+import re
+from .merge_bibtex_entries import RAW_DIR, PROCESSED_DIR
+
+# An entry starts on any line whose first non-blank character is '@',
+# matching the rule used by `merge_bibtex_entries.split_bib_entries`.
+# Anchoring on a literal newline (instead of '^' with re.MULTILINE) keeps the scan fast
+ENTRY_START = re.compile(rb"\n[ \t]*@")
+FIRST_ENTRY_START = re.compile(rb"[ \t]*@")
+# Lines that can hold the deduplication key (see `merge_bibtex_entries.extract_key`)
+KEY_LINE = re.compile(rb"\n[ \t]*(doi|title)[^\n]*", re.IGNORECASE)
+TRAILING_WHITESPACE = b" \t\r\n"
+
+def list_raw_files(raw_dir=RAW_DIR):
+    """
+    Lists the raw .bib files in a stable (sorted) order
+    """
+    return sorted(Path(raw_dir).glob("*.bib"))
+
+def find_entry_starts(mm):
+    """
+    Returns the byte offsets of the lines that start a BibTeX entry
+    """
+    starts = [0] if FIRST_ENTRY_START.match(mm) else []
+    starts.extend(m.start() + 1 for m in ENTRY_START.finditer(mm))
+    return starts
+
+def extract_key_bytes(mm, start, end):
+    """
+    Byte-level equivalent of `merge_bibtex_entries.extract_key` that only decodes
+    the DOI/title lines of the entry located at mm[start:end]
+    """
+    title = None
+    for match in KEY_LINE.finditer(mm, start, end):
+        line = match.group(0).decode("utf-8", errors="replace").strip()
+        value = line.split("=", 1)[-1].strip().strip(",{}").lower()
+        if match.group(1).lower() == b"doi":
+            return value
+        if not title:
+            title = value
+    return title
+
+def scan_file(job):
+    """
+    Memory-maps a raw BibTeX file, finds entry boundaries with a byte-level
+    regex scan and extracts the deduplication key of each entry
+    Args:
+        job (tuple): (file_index, path)
+    Returns:
+        list[tuple]: (file_index, key, offset, length) records in file order
+    """
+    file_index, path = job
+    if os.path.getsize(path) == 0:
+        return []
+    records = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = find_entry_starts(mm)
+        ends = starts[1:] + [len(mm)]
+        for start, end in zip(starts, ends):
+            while end > start and mm[end - 1] in TRAILING_WHITESPACE:
+                end -= 1
+            records.append((file_index, extract_key_bytes(mm, start, end), start, end - start))
+    return records
+
+def read_entries(path):
+    """
+    Scans one raw BibTeX file and decodes its entries straight from the memory map
+    Returns:
+        list[tuple]: (key, entry text) in file order
+    """
+    records = scan_file((0, path))
+    if not records:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [
+            (key, mm[offset:offset + length].decode("utf-8", errors="replace"))
+            for _, key, offset, length in records
+        ]
+
+def ingest_raw_files(files, workers=None):
+    """
+    Scans raw files in parallel across a process pool
+    Records are yielded file by file in the order of `files`, so results are
+    stable regardless of which worker finishes first
+    """
+    jobs = list(enumerate(files))
+    if workers == 1 or len(jobs) < 2:
+        for job in jobs:
+            yield from scan_file(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in pool.map(scan_file, jobs, chunksize=max(1, len(jobs) // 64)):
+            yield from records
+
+def merge_records(records):
+    """
+    Removes duplicate records based on their DOI/title key, keeping the first one
+    Returns:
+        tuple: (unique_records, duplicate_records)
+    """
+    seen = {}
+    duplicates = []
+    for record in records:
+        key = record[1]
+        if key in seen:
+            duplicates.append(record)
+        else:
+            seen[key] = record
+    return list(seen.values()), duplicates
+
+def save_records(records, files, path):
+    """
+    Writes the entries referenced by (file_index, key, offset, length) records to a
+    BibTeX file, copying the bytes straight from the memory-mapped raw files
+    """
+    handles = {}
+    try:
+        with open(path, "wb") as out:
+            for file_index, _, offset, length in records:
+                if file_index not in handles:
+                    f = open(files[file_index], "rb")
+                    handles[file_index] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                out.write(handles[file_index][1][offset:offset + length])
+                out.write(b"\n\n")
+    finally:
+        for f, mm in handles.values():
+            mm.close()
+            f.close()
+
+def main(workers=None):
+    """
+    Main function to:
+    - Scan all raw BibTeX files in parallel (mmap + byte scan)
+    - Merge and deduplicate the compact entry records
+    - Save merged and duplicate results
+    """
+    files = list_raw_files()
+    records = list(ingest_raw_files(files, workers))
+    unique_records, duplicate_records = merge_records(records)
+    save_records(unique_records, files, PROCESSED_DIR / "merged.bib")
+    save_records(duplicate_records, files, PROCESSED_DIR / "duplicates.bib")
+    print(f"Merged: {len(unique_records)} entries")
+    print(f"Duplicates: {len(duplicate_records)} entries")
@@ -1,8 +1,10 @@
 import re
 import json
 from pathlib import Path
-from itertools import combinations
-from typing import Dict
+from typing import Dict, Optional
+import numpy as np
+from scipy import sparse
+from .similarity_scores import save_scores, SCORE_FLOOR, SCORE_TOP_K
 
 def parse_bibtex_abstracts(path: Path) -> Dict[str, str]:
     """
@@ -13,23 +15,29 @@ def parse_bibtex_abstracts(path: Path) -> Dict[str, str]:
         content = f.read()
     entries = re.split(r"\n(?=@\w+\{)", content)
     print(f"Total entries split: {len(entries)}")
-    abstracts = {}
-    for entry in entries:
-        key_match = re.match(r"@\w+\{([^,]+),", entry)
-        abstract_match = re.search(
-            r"abstract\s*=\s*(\{|\")([\s\S]+?)(\}|\")\s*,?",
-            entry,
-            re.IGNORECASE
-        )
-        if key_match and abstract_match:
-            key = key_match.group(1).strip()
-            abstract = abstract_match.group(2).strip().replace("\n", " ").lower()
-            if len(abstract) > 30:
-                abstracts[key] = abstract
+    abstracts = dict(filter(None, map(entry_abstract, entries)))
     print(f"\nExtracted {len(abstracts)} abstracts with content.")
     print(f"Unique abstracts: {len(set(abstracts.values()))}")
     return abstracts
 
+def entry_abstract(entry: str) -> Optional[tuple]:
+    """
+    Returns (citation key, lowercased abstract) of one BibTeX entry, or None if it has
+    no abstract longer than 30 characters
+    Shared with the streaming pipeline so both compute the same similarities
+    """
+    key_match = re.match(r"@\w+\{([^,]+),", entry)
+    abstract_match = re.search(
+        r"abstract\s*=\s*(\{|\")([\s\S]+?)(\}|\")\s*,?",
+        entry,
+        re.IGNORECASE
+    )
+    if key_match and abstract_match:
+        abstract = abstract_match.group(2).strip().replace("\n", " ").lower()
+        if len(abstract) > 30:
+            return key_match.group(1).strip(), abstract
+    return None
+
 def jaccard_similarity(a: str, b: str) -> float:
     """
     Calculates Jaccard similarity between two abstracts using word-level sets
@@ -41,41 +49,112 @@ def jaccard_similarity(a: str, b: str) -> float:
         return 0.0
     return len(set_a & set_b) / len(set_a | set_b)
 
+def append_token_rows(vocabulary: dict, indices, indptr, abstracts):
+    """
+    Appends the word sets of abstracts as CSR rows (column indices and row pointers)
+    New words are added to `vocabulary`; `indices` and `indptr` may be lists or arrays
+    """
+    for abstract in abstracts:
+        indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in set(abstract.split()))
+        indptr.append(len(indices))
+
+def token_matrix(abstracts: dict) -> sparse.csr_matrix:
+    """
+    Builds the binary document x word matrix of the abstracts' word sets
+    """
+    vocabulary = {}
+    indices, indptr = [], [0]
+    append_token_rows(vocabulary, indices, indptr, abstracts.values())
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(abstracts), len(vocabulary)))
+
+def jaccard_scores(abstracts: dict, threshold=0.2, floor=None, top_k=SCORE_TOP_K, chunk_size=None):
+    """
+    Computes Jaccard similarities block by block from sparse word-set intersections
+    Keeps every pair with similarity >= threshold and, when `floor` is lower, each
+    abstract's `top_k` most similar pairs with similarity >= floor
+    Only one (chunk_size x n) block of scores is held in memory at a time
+    Returns:
+        tuple: (sources, targets, similarities) NumPy arrays with source < target,
+        sorted by (source, target); indices follow the insertion order of `abstracts`
+    """
+    n = len(abstracts)
+    floor = threshold if floor is None else min(floor, threshold)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    X = token_matrix(abstracts)
+    XT = X.T.tocsc()
+    sizes = np.asarray(X.sum(axis=1)).ravel()
+    chunk_size = chunk_size or max(1, 2_000_000 // n)
+    k = min(top_k, n - 1)
+    codes, scores = [], []
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        rows = np.arange(start, stop)
+        intersection = (X[start:stop] @ XT).toarray()
+        sims = intersection / (sizes[start:stop, None] + sizes[None, :] - intersection)
+        sims[rows - start, rows] = -1.0
+        # Exact pairs above the threshold, each counted once from its lower index
+        r, c = np.nonzero((sims >= threshold) & (np.arange(n)[None, :] > rows[:, None]))
+        codes.append((r + start) * n + c)
+        scores.append(sims[r, c])
+        if k and floor < threshold:
+            best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            best_sims = np.take_along_axis(sims, best, axis=1)
+            keep = (best_sims >= floor) & (best_sims < threshold)
+            sources = np.broadcast_to(rows[:, None], best.shape)[keep]
+            targets = best[keep]
+            codes.append(np.minimum(sources, targets) * n + np.maximum(sources, targets))
+            scores.append(best_sims[keep])
+    codes, first = np.unique(np.concatenate(codes), return_index=True)
+    return codes // n, codes % n, np.concatenate(scores)[first]
+
 def compute_jaccard_matrix(abstracts: dict, threshold=0.2) -> list[dict]:
     """
     Computes pairwise Jaccard similarity between all abstracts
     Returns a list of dictionaries containing only pairs with similarity above the given threshold
     """
-    similar_pairs = []
     keys = list(abstracts.keys())
-    for i, j in combinations(range(len(keys)), 2):
-        key_i, key_j = keys[i], keys[j]
-        sim = jaccard_similarity(abstracts[key_i], abstracts[key_j])
-        if sim >= threshold:
-            similar_pairs.append({
-                "source": key_i,
-                "target": key_j,
-                "similarity": round(sim, 4)
-            })
-    return similar_pairs
+    sources, targets, sims = jaccard_scores(abstracts, threshold)
+    return [
+        {"source": keys[i], "target": keys[j], "similarity": round(float(sim), 4)}
+        for i, j, sim in zip(sources, targets, sims)
+    ]
 
 def run_jaccard_similarity(
     bib_path: Path,
     output_path: Path,
-    threshold: float = 0.2
+    threshold: float = 0.2,
+    scores_path: Optional[Path] = None
 ):
     """
     Main pipeline to run Jaccard similarity:
     - Loads abstracts from a BibTeX file
     - Computes pairwise Jaccard similarities
+    - Optionally stores, for threshold sweeps, every pair above the threshold plus
+      each abstract's SCORE_TOP_K best pairs down to SCORE_FLOOR
     - Filters based on threshold
     - Saves result to a JSON file
+    Returns the saved pairs
     """
     print("Loading abstracts...")
     abstracts = parse_bibtex_abstracts(bib_path)
+    keys = list(abstracts.keys())
     print("Computing Jaccard similarities...")
-    result = compute_jaccard_matrix(abstracts, threshold=threshold)
+    floor = min(threshold, SCORE_FLOOR) if scores_path else threshold
+    sources, targets, sims = jaccard_scores(abstracts, threshold, floor)
+    if scores_path:
+        save_scores(scores_path, keys, sources, targets, sims, floor, top_k=SCORE_TOP_K if floor < threshold else 0,
+                    exact_from=threshold)
+        print(f"Stored {len(sims)} scores >= {floor} in {scores_path}")
+    above = sims >= threshold
+    result = [
+        {"source": keys[i], "target": keys[j], "similarity": round(float(sim), 4)}
+        for i, j, sim in zip(sources[above], targets[above], sims[above])
+    ]
     print(f"Saving {len(result)} pairs with similarity >= {threshold}")
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
     print(f"Saved to {output_path}")
+    return result
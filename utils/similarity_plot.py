@@ -2,15 +2,33 @@ import json
 import networkx as nx
 import matplotlib.pyplot as plt
 from pathlib import Path
+from typing import Optional
+from .analysis_store import open_store, store_exists, has_similarity_pairs, load_similarity_pairs
 
-def plot_similarity_graph(json_path: Path, output_path: Path):
+def load_similarity_data(json_path: Path, method: Optional[str] = None) -> list[dict]:
     """
-    Loads pairwise similarity results from a JSON file and visualizes the similarity network using NetworkX
+    Loads similarity pairs for a method from the analysis database,
+    falling back to the JSON file when the database has no pairs for it
+    """
+    if method and store_exists():
+        conn = open_store()
+        try:
+            if has_similarity_pairs(conn, method):
+                return load_similarity_pairs(conn, method)
+        finally:
+            conn.close()
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def plot_similarity_graph(json_path: Path, output_path: Path, title: str = "Jaccard Similarity Graph (abstracts)",
+                          method: Optional[str] = None):
+    """
+    Loads pairwise similarity results (from the analysis database if `method` is given,
+    otherwise from a JSON file) and visualizes the similarity network using NetworkX
     Nodes represent BibTeX entries; edges represent similarity links with weights
     Saves the plot to the given output path
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_similarity_data(json_path, method)
 
     G = nx.Graph()
     for item in data:
@@ -29,7 +47,7 @@ def plot_similarity_graph(json_path: Path, output_path: Path):
     nx.draw_networkx_edges(G, pos, width=weights, alpha=0.7) #type: ignore
     nx.draw_networkx_labels(G, pos, font_size=8)
 
-    plt.title("Jaccard Similarity Graph (abstracts)")
+    plt.title(title)
     plt.axis("off")
     plt.tight_layout()
     plt.savefig(output_path)
@@ -0,0 +1,176 @@
+import json
+from pathlib import Path
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Lowest similarity kept in the score files; sweeps cannot go below it
+SCORE_FLOOR = 0.1
+# Pairs per entry kept below the run threshold by methods that cannot store every pair
+SCORE_TOP_K = 50
+SCORES_DIR = Path("data/processed")
+
+def scores_path(method: str, scores_dir: Path = SCORES_DIR) -> Path:
+    """
+    Returns the path of the binary score file of a similarity method
+    """
+    return Path(scores_dir) / f"{method}_scores.npz"
+
+def save_scores(path: Path, keys: list[str], sources, targets, similarities, floor: float = SCORE_FLOOR,
+                top_k: int = 0, exact_from: float = None):
+    """
+    Saves all pairs with similarity >= floor as a compact binary file
+    Pairs are stored as int32 node indices and float32 scores, sorted by decreasing similarity
+    - `top_k`: non-zero when at most top_k pairs per entry were kept
+    - `exact_from`: lowest threshold at which the stored pairs are complete (defaults to floor);
+      below it only the per-entry top-k pairs are available
+    With `top_k` and no higher `exact_from`, every stored pair comes from a top-k search
+    (e.g. semantic nearest neighbours): exports match the method's own output at any
+    threshold, but sweep counts describe the top-k graph rather than all pairs
+    """
+    similarities = np.asarray(similarities, dtype=np.float32)
+    order = np.argsort(-similarities, kind="stable")
+    np.savez_compressed(
+        path,
+        keys=np.asarray(keys, dtype=str),
+        source=np.asarray(sources, dtype=np.int32)[order],
+        target=np.asarray(targets, dtype=np.int32)[order],
+        similarity=similarities[order],
+        floor=np.float64(floor),
+        top_k=np.int32(top_k),
+        exact_from=np.float64(floor if exact_from is None else exact_from),
+    )
+
+def load_scores(path: Path) -> dict:
+    """
+    Loads a score file saved by `save_scores`
+    """
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+def exact_from(scores: dict) -> float:
+    """
+    Returns the lowest threshold at which the stored pairs are complete
+    Score files written before this was recorded are complete down to their floor
+    """
+    return float(scores["exact_from"]) if "exact_from" in scores else float(scores["floor"])
+
+def is_exact(scores: dict, threshold: float) -> bool:
+    """
+    Returns True if the stored pairs at a threshold are all pairs, not only per-entry top-k ones
+    """
+    top_k_only = "top_k" in scores and int(scores["top_k"]) and exact_from(scores) <= float(scores["floor"])
+    return threshold >= exact_from(scores) and not top_k_only
+
+def count_above(scores: dict, threshold: float) -> int:
+    """
+    Returns the number of pairs with similarity >= threshold (scores are sorted descending)
+    """
+    return int(np.searchsorted(-scores["similarity"], -np.float32(threshold), side="right"))
+
+def pairs_above(scores: dict, threshold: float) -> list[dict]:
+    """
+    Returns the pairs with similarity >= threshold in the JSON output schema
+    """
+    keys = scores["keys"]
+    n = count_above(scores, threshold)
+    return [
+        {"source": str(keys[i]), "target": str(keys[j]), "similarity": round(float(sim), 4)}
+        for i, j, sim in zip(scores["source"][:n], scores["target"][:n], scores["similarity"][:n])
+    ]
+
+def graph_summary(scores: dict, threshold: float) -> dict:
+    """
+    Counts edges, connected nodes and connected components of the similarity graph at a threshold
+    Only nodes with at least one edge are counted, as in the plotted graphs
+    """
+    n_edges = count_above(scores, threshold)
+    n_keys = len(scores["keys"])
+    sources, targets = scores["source"][:n_edges], scores["target"][:n_edges]
+    adjacency = sparse.coo_matrix((np.ones(n_edges, dtype=np.int8), (sources, targets)), shape=(n_keys, n_keys))
+    n_components, _ = connected_components(adjacency, directed=False)
+    n_nodes = len(np.union1d(sources, targets))
+    return {
+        "threshold": threshold,
+        "exact": is_exact(scores, threshold),
+        "edges": n_edges,
+        "nodes": n_nodes,
+        # Every key without edges is its own component in scipy's count
+        "components": int(n_components - (n_keys - n_nodes)),
+    }
+
+def sweep_thresholds(scores: dict, thresholds: list[float], bins: int = 20) -> dict:
+    """
+    Summarizes the similarity graph for many thresholds at once and
+    builds a histogram of the stored similarity distribution
+    """
+    floor = float(scores["floor"])
+    counts, edges = np.histogram(scores["similarity"], bins=bins, range=(floor, 1.0))
+    return {
+        "floor": floor,
+        "exact_from": exact_from(scores),
+        "top_k": int(scores["top_k"]) if "top_k" in scores else 0,
+        "thresholds": [graph_summary(scores, t) for t in sorted(thresholds) if t >= floor],
+        "histogram": [
+            {"from": round(float(lo), 4), "to": round(float(hi), 4), "pairs": int(c)}
+            for lo, hi, c in zip(edges[:-1], edges[1:], counts)
+        ],
+    }
+
+def print_sweep(report: dict):
+    """
+    Prints a threshold sweep report as text tables
+    """
+    print(f"\nThreshold sweep (scores stored from {report['floor']}):")
+    if report["top_k"] and report["exact_from"] > report["floor"]:
+        print(f"  below {report['exact_from']} only the top {report['top_k']} pairs per entry are stored")
+    elif report["top_k"]:
+        print(f"  only the top {report['top_k']} neighbours per entry are stored: counts describe the top-k graph")
+    print(f"  {'threshold':>9}  {'edges':>8}  {'nodes':>7}  {'components':>10}")
+    for row in report["thresholds"]:
+        flag = "" if row["exact"] else "  (approximate: top-k pairs only)"
+        print(f"  {row['threshold']:>9.3f}  {row['edges']:>8}  {row['nodes']:>7}  {row['components']:>10}{flag}")
+    print("\nSimilarity histogram:")
+    peak = max((b["pairs"] for b in report["histogram"]), default=0) or 1
+    for b in report["histogram"]:
+        bar = "#" * int(40 * b["pairs"] / peak)
+        print(f"  [{b['from']:.2f}, {b['to']:.2f})  {b['pairs']:>8}  {bar}")
+
+def run_threshold_sweep(method: str, thresholds: list[float], report_path: Path = None):
+    """
+    Main function to run a threshold sweep from a stored score file and save the report as JSON
+    """
+    path = scores_path(method)
+    if not path.exists():
+        print(f"No stored scores for '{method}'. Run the {method} similarity first.")
+        return None
+    report = sweep_thresholds(load_scores(path), thresholds)
+    print_sweep(report)
+    report_path = report_path or SCORES_DIR / f"{method}_sweep.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSweep report saved to {report_path}")
+    return report
+
+def export_threshold(method: str, threshold: float, output_path: Path):
+    """
+    Writes the similarity JSON for a threshold from the stored scores, without recomputing them
+    Returns the exported pairs, or None if no usable score file exists
+    """
+    path = scores_path(method)
+    if not path.exists():
+        print(f"No stored scores for '{method}'. Run the {method} similarity first.")
+        return None
+    scores = load_scores(path)
+    if threshold < float(scores["floor"]):
+        print(f"Threshold {threshold} is below the stored floor {float(scores['floor'])}.")
+        return None
+    if threshold < exact_from(scores):
+        print(f"Stored '{method}' scores are only complete from {exact_from(scores)} "
+              f"(top-k pairs per entry below it). Re-run {method} with --threshold {threshold} instead.")
+        return None
+    similar_pairs = pairs_above(scores, threshold)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(similar_pairs, f, indent=2)
+    print(f"Saved {len(similar_pairs)} pairs with similarity >= {threshold} to {output_path}")
+    return similar_pairs
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import pickle
+from pathlib import Path
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import Normalizer
+from .similarity_tfidf import parse_bibtex_abstracts
+from .similarity_scores import save_scores, SCORE_FLOOR
+
+# Paths
+MODEL_PATH = Path("data/processed/semantic_model.pkl")
+CACHE_PATH = Path("data/processed/semantic_cache.npz")
+
+# Dimensions of the LSA embedding space
+N_COMPONENTS = 256
+BATCH_SIZE = 4096
+
+def abstract_hash(text: str) -> str:
+    """
+    Returns a stable hash of an abstract, used as the embedding cache key
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def fit_lsa_model(texts: list[str], n_components: int = N_COMPONENTS):
+    """
+    Fits a TF-IDF + truncated SVD (latent semantic analysis) model on CPU
+    The output vectors are L2-normalized, so dot products are cosine similarities
+    """
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, min_df=2 if len(texts) > 1000 else 1)
+    n_terms = len(vectorizer.fit(texts).vocabulary_)
+    n_components = max(1, min(n_components, len(texts) - 1, n_terms - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=42)
+    model = make_pipeline(vectorizer, svd, Normalizer(copy=False))
+    model.fit(texts)
+    return model
+
+def load_or_fit_model(texts: list[str], path: Path = MODEL_PATH, refit: bool = False):
+    """
+    Loads the persisted LSA model, fitting and saving a new one if needed
+    Returns:
+        tuple: (model, model_id) where model_id identifies the model in the cache
+    """
+    if path.exists() and not refit:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        return payload["model"], payload["model_id"]
+    print("Fitting LSA model (TF-IDF + truncated SVD)...")
+    model = fit_lsa_model(texts)
+    model_id = hashlib.sha1("".join(sorted(map(abstract_hash, texts))).encode("utf-8")).hexdigest()
+    with open(path, "wb") as f:
+        pickle.dump({"model": model, "model_id": model_id}, f)
+    return model, model_id
+
+def load_cache(model_id: str, path: Path = CACHE_PATH) -> dict:
+    """
+    Loads cached embeddings as {abstract hash: vector}
+    The cache is discarded when it was built with a different model
+    """
+    if not path.exists():
+        return {}
+    data = np.load(path)
+    if str(data["model_id"]) != model_id:
+        return {}
+    return dict(zip(data["hashes"].tolist(), data["vectors"]))
+
+def save_cache(cache: dict, model_id: str, path: Path = CACHE_PATH):
+    """
+    Saves the embedding cache as a compressed NumPy archive
+    """
+    hashes = np.array(list(cache.keys()))
+    vectors = np.stack(list(cache.values())) if cache else np.zeros((0, 0), dtype=np.float32)
+    np.savez_compressed(path, model_id=model_id, hashes=hashes, vectors=vectors)
+
+def encode_abstracts(texts: list[str], model, cache: dict, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """
+    Embeds abstracts in batches, only encoding those not found in the cache
+    Returns a float32 matrix with one L2-normalized row per abstract
+    """
+    hashes = [abstract_hash(t) for t in texts]
+    missing = list({h: t for h, t in zip(hashes, texts) if h not in cache}.items())
+    print(f"Embedding {len(missing)} new abstracts ({len(texts) - len(missing)} cached)...")
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        vectors = model.transform([t for _, t in batch]).astype(np.float32)
+        cache.update(zip([h for h, _ in batch], vectors))
+    return np.stack([cache[h] for h in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
+
+def build_ivf_index(vectors: np.ndarray, n_lists: int = None, n_iter: int = 10, seed: int = 42) -> dict:
+    """
+    Builds an inverted-file (IVF) index with spherical k-means in NumPy
+    Each vector is assigned to its closest centroid; searches then only compare
+    vectors from a few nearby lists instead of the whole collection
+    """
+    n = len(vectors)
+    if n_lists is None:
+        n_lists = max(1, int(np.sqrt(n)))
+    n_lists = min(n_lists, n)
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(n, size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = assign_to_centroids(vectors, centroids)
+        for c in range(n_lists):
+            members = vectors[assignment == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    assignment = assign_to_centroids(vectors, centroids)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+    return {"centroids": centroids, "order": order, "offsets": offsets}
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """
+    Returns the index of the most similar centroid for every vector
+    """
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        assignment[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assignment
+
+def search_similar_pairs(vectors: np.ndarray, index: dict, top_k: int = 10,
+                         threshold: float = 0.0, n_probe: int = 8) -> dict:
+    """
+    Finds, for every vector, its top-k most similar vectors with similarity >= threshold
+    For each IVF list, its members are compared in one matrix product against the
+    members of the `n_probe` lists whose centroids are closest to it
+    Returns:
+        dict: (i, j) with i < j -> similarity
+    """
+    centroids, order, offsets = index["centroids"], index["order"], index["offsets"]
+    n_lists = len(centroids)
+    n_probe = min(n_probe, n_lists)
+    neighbours = np.argsort(-(centroids @ centroids.T), axis=1)[:, :n_probe]
+    sources, targets, scores = [], [], []
+    for c in range(n_lists):
+        members = order[offsets[c]:offsets[c + 1]]
+        if len(members) == 0:
+            continue
+        candidates = np.concatenate([order[offsets[p]:offsets[p + 1]] for p in neighbours[c]])
+        sims = vectors[members] @ vectors[candidates].T
+        sims[members[:, None] == candidates[None, :]] = -1.0
+        k = min(top_k, len(candidates))
+        best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        best_sims = np.take_along_axis(sims, best, axis=1)
+        keep = best_sims >= max(threshold, -1.0 + 1e-6)
+        sources.append(np.broadcast_to(members[:, None], best.shape)[keep])
+        targets.append(candidates[best][keep])
+        scores.append(best_sims[keep])
+    if not sources:
+        return {}
+    sources, targets, scores = np.concatenate(sources), np.concatenate(targets), np.concatenate(scores)
+    low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+    return {(int(i), int(j)): float(sim) for i, j, sim in zip(low, high, scores)}
+
+def run_semantic_similarity(bib_path: Path, output_path: Path, threshold: float = 0.7,
+                            top_k: int = 10, refit: bool = False, scores_path: Path = None):
+    """
+    Main pipeline to run semantic (LSA embedding) similarity:
+    - Loads abstracts from a BibTeX file
+    - Embeds them with a local TF-IDF + SVD model, reusing cached vectors
+    - Builds an approximate nearest-neighbour (IVF) index
+    - Optionally stores every top-k pair above SCORE_FLOOR for threshold sweeps
+    - Saves the top-k pairs with similarity >= threshold to a JSON file,
+      with the same schema as the Jaccard and TF-IDF outputs
+    Returns the saved pairs
+    """
+    print("Loading abstracts...")
+    abstracts = parse_bibtex_abstracts(bib_path)
+    keys = list(abstracts.keys())
+    texts = [abstracts[k] for k in keys]
+    if len(texts) < 2:
+        print("Not enough abstracts to compare.")
+        return []
+    model, model_id = load_or_fit_model(texts, refit=refit)
+    cache = load_cache(model_id)
+    vectors = encode_abstracts(texts, model, cache)
+    save_cache(cache, model_id)
+    print("Building approximate nearest-neighbour index...")
+    index = build_ivf_index(vectors)
+    print(f"Searching top-{top_k} neighbours with similarity >= {threshold}...")
+    floor = min(threshold, SCORE_FLOOR) if scores_path else threshold
+    pairs = search_similar_pairs(vectors, index, top_k=top_k, threshold=floor)
+    if scores_path:
+        save_scores(scores_path, keys, [i for i, _ in pairs], [j for _, j in pairs], list(pairs.values()), floor,
+                    top_k=top_k)
+        print(f"Stored {len(pairs)} scores >= {floor} in {scores_path}")
+    similar_pairs = [
+        {"source": keys[i], "target": keys[j], "similarity": round(sim, 4)}
+        for (i, j), sim in sorted(pairs.items()) if sim >= threshold
+    ]
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(similar_pairs, f, indent=2)
+    print(f"Saved {len(similar_pairs)} similar pairs to {output_path}")
+    return similar_pairs
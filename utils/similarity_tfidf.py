@@ -1,9 +1,11 @@
 import json
 import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from .similarity_scores import save_scores, SCORE_FLOOR
 
 def parse_bibtex_abstracts(path: Path) -> Dict[str, str]:
     """
@@ -29,11 +31,13 @@ def parse_bibtex_abstracts(path: Path) -> Dict[str, str]:
     print(f"Unique abstracts: {len(set(abstracts.values()))}")
     return abstracts
 
-def run_tfidf_similarity(bib_path: Path, output_path: Path, threshold: float = 0.3):
+def run_tfidf_similarity(bib_path: Path, output_path: Path, threshold: float = 0.3,
+                         scores_path: Optional[Path] = None):
     """
     Applies TF-IDF vectorization to abstracts and calculates pairwise cosine similarity
     Returns only those pairs with similarity greater than or equal to the specified threshold
-    Outputs the result to a JSON file
+    Optionally stores every pair above SCORE_FLOOR for threshold sweeps
+    Outputs the result to a JSON file and returns the saved pairs
     """
     print("Loading abstracts...")
     abstracts = parse_bibtex_abstracts(bib_path)
@@ -44,17 +48,18 @@ def run_tfidf_similarity(bib_path: Path, output_path: Path, threshold: float = 0
     tfidf_matrix = vectorizer.fit_transform(texts)
     print("Computing cosine similarities...")
     cosine_sim = cosine_similarity(tfidf_matrix)
-    print(f"Filtering pairs with similarity >= {threshold}...")
-    similar_pairs = []
-    for i in range(len(keys)):
-        for j in range(i + 1, len(keys)):
-            sim = cosine_sim[i, j]
-            if sim >= threshold:
-                similar_pairs.append({
-                    "source": keys[i],
-                    "target": keys[j],
-                    "similarity": round(sim, 4)
-                })
+    floor = min(threshold, SCORE_FLOOR) if scores_path else threshold
+    print(f"Filtering pairs with similarity >= {floor}...")
+    rows, cols = np.nonzero(np.triu(cosine_sim >= floor, k=1))
+    sims = cosine_sim[rows, cols]
+    if scores_path:
+        save_scores(scores_path, keys, rows, cols, sims, floor)
+        print(f"Stored {len(sims)} scores >= {floor} in {scores_path}")
+    similar_pairs = [
+        {"source": keys[i], "target": keys[j], "similarity": round(float(sim), 4)}
+        for i, j, sim in zip(rows, cols, sims) if sim >= threshold
+    ]
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(similar_pairs, f, indent=2)
     print(f"Saved {len(similar_pairs)} similar pairs to {output_path}")
+    return similar_pairs
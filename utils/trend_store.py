@@ -0,0 +1,237 @@
+from pathlib import Path
+from collections import Counter
+import json
+from .analyze_bibtex import parse_bibtex_entries, extract_field, entity_label, canonical_name
+from .entity_index import split_authors, resolve
+from .keyword_analysis import parse_keywords, count_keywords_with_synonyms
+from .merge_bibtex_entries import extract_key
+
+# Paths
+MERGED_PATH = Path("data/processed/merged.bib")
+TRENDS_DIR = Path("data/processed/trends")
+MANIFEST_PATH = TRENDS_DIR / "manifest.json"
+TREND_FIGURES_DIR = Path("figures/trends")
+
+# Partition used for entries without a publication year
+UNKNOWN_YEAR = "unknown"
+# Stored in the manifest; partitions written with another version are rebuilt
+TRENDS_VERSION = 2
+MANIFEST_VERSION_KEY = "__version__"
+# Aggregate kinds whose names are resolved through the entity index
+ENTITY_KINDS = {"authors": "author", "venues": "journal"}
+
+def partition_path(year, trends_dir=TRENDS_DIR):
+    """
+    Returns the path of the aggregate partition for a publication year
+    """
+    return Path(trends_dir) / f"{year}.json"
+
+def empty_partition(year):
+    """
+    Returns a new, empty aggregate partition for a publication year
+    """
+    return {"year": year, "entries": 0, "types": {}, "venues": {}, "authors": {}, "keywords": {}}
+
+def load_partition(year, trends_dir=TRENDS_DIR):
+    """
+    Loads the partition of a year or returns an empty one if it does not exist yet
+    """
+    path = partition_path(year, trends_dir)
+    if not path.exists():
+        return empty_partition(year)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_partition(partition, trends_dir=TRENDS_DIR):
+    """
+    Saves a year partition as JSON
+    """
+    with open(partition_path(partition["year"], trends_dir), "w", encoding="utf-8") as f:
+        json.dump(partition, f, indent=2, ensure_ascii=False)
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    Loads the manifest mapping each aggregated entry key to its year
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def add_counts(target, counter):
+    """
+    Adds the counts of `counter` into the `target` dictionary in place
+    """
+    for key, value in counter.items():
+        if value:
+            target[key] = target.get(key, 0) + value
+
+def entry_aggregates(entry, keyword_maps, index=None):
+    """
+    Computes the counts contributed by a single BibTeX entry
+    Venue and author names are stored under their stable entity key when an index is given;
+    display names are only looked up when querying (see `display_counts`)
+    Returns:
+        tuple: (year, aggregates) with one counter per aggregate kind
+    """
+    year = (extract_field(entry, "year") or UNKNOWN_YEAR).strip()
+    entry_type = entry.split("{", 1)[0].replace("@", "").strip().lower()
+    venue = extract_field(entry, "journal") or extract_field(entry, "booktitle")
+    abstract = extract_field(entry, "abstract")
+    aggregates = {
+        "types": Counter({entry_type: 1}),
+        "venues": Counter(),
+        "authors": Counter(),
+        "keywords": {},
+    }
+    if venue:
+        aggregates["venues"][entity_label(index, "journal", venue)] += 1
+    for author in split_authors(extract_field(entry, "author")):
+        aggregates["authors"][entity_label(index, "author", author)] += 1
+    if abstract:
+        abstract = abstract.replace("\n", " ").lower()
+        for category, keyword_map in keyword_maps.items():
+            aggregates["keywords"][category] = count_keywords_with_synonyms([abstract], keyword_map)
+    return year, aggregates
+
+def update_trend_store(entries, categories, index=None, trends_dir=TRENDS_DIR):
+    """
+    Adds new entries to the year-partitioned aggregate store
+    Only entries not listed in the manifest are counted, and only the
+    partitions of their publication years are loaded and rewritten
+    Args:
+        entries (list[str]): BibTeX entries
+        categories (dict): category name -> raw keyword list (see `main.py`)
+        index (dict): optional entity index used to merge name variants
+    Returns:
+        list[str]: The years whose partitions were updated
+    """
+    trends_dir = Path(trends_dir)
+    trends_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = trends_dir / MANIFEST_PATH.name
+    manifest = load_manifest(manifest_path)
+    if manifest.get(MANIFEST_VERSION_KEY) != TRENDS_VERSION:
+        # Partitions from an older layout are dropped and rebuilt from the given entries
+        for path in trends_dir.glob("*.json"):
+            path.unlink()
+        manifest = {MANIFEST_VERSION_KEY: TRENDS_VERSION}
+    keyword_maps = {name: parse_keywords(raw) for name, raw in categories.items()}
+    partitions = {}
+    for entry in entries:
+        entry_key = extract_key(entry)
+        if not entry_key or entry_key in manifest:
+            continue
+        year, aggregates = entry_aggregates(entry, keyword_maps, index)
+        if year not in partitions:
+            partitions[year] = load_partition(year, trends_dir)
+        partition = partitions[year]
+        partition["entries"] += 1
+        for kind in ("types", "venues", "authors"):
+            add_counts(partition[kind], aggregates[kind])
+        for category, counts in aggregates["keywords"].items():
+            add_counts(partition["keywords"].setdefault(category, {}), counts)
+        manifest[entry_key] = year
+    for partition in partitions.values():
+        save_partition(partition, trends_dir)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return sorted(partitions)
+
+def load_partitions(trends_dir=TRENDS_DIR):
+    """
+    Loads all year partitions (excluding entries without a year), sorted by year
+    """
+    partitions = []
+    for path in sorted(Path(trends_dir).glob("*.json")):
+        if path.stem in (MANIFEST_PATH.stem, UNKNOWN_YEAR):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            partitions.append(json.load(f))
+    return partitions
+
+def display_counts(kind, counts, index=None, names=None):
+    """
+    Merges the counts of a partition into counts per current display name
+    Author and venue entity keys are mapped through the entity index; `names` caches the mapping
+    """
+    if kind not in ENTITY_KINDS or not index:
+        return counts
+    names = {} if names is None else names
+    merged = Counter()
+    for label, count in counts.items():
+        if label not in names:
+            names[label] = canonical_name(index, ENTITY_KINDS[kind], label)
+        merged[names[label]] += count
+    return merged
+
+def trend(kind, name, category=None, index=None, trends_dir=TRENDS_DIR):
+    """
+    Returns the yearly counts {year: count} of a type, venue, author or keyword
+    Authors and venues can be given in any spelling known to the entity index
+    Keywords are looked up by their canonical (first) synonym inside `category`; without
+    a category a keyword listed in several categories is counted once (its highest count)
+    """
+    if kind in ENTITY_KINDS and index:
+        name = canonical_name(index, ENTITY_KINDS[kind], resolve(index, ENTITY_KINDS[kind], name) or name)
+    series, names = {}, {}
+    for partition in load_partitions(trends_dir):
+        counts = partition[kind]
+        if kind == "keywords":
+            categories = [category] if category else list(counts)
+            series[partition["year"]] = max((counts.get(c, {}).get(name.lower(), 0) for c in categories), default=0)
+        else:
+            series[partition["year"]] = display_counts(kind, counts, index, names).get(name, 0)
+    return series
+
+def top_names(kind, n=5, category=None, index=None, trends_dir=TRENDS_DIR):
+    """
+    Returns the `n` most frequent (display) names of an aggregate kind across all years
+    """
+    total, names = Counter(), {}
+    for partition in load_partitions(trends_dir):
+        counts = partition[kind]
+        if kind == "keywords":
+            counts = counts.get(category, {})
+        total.update(display_counts(kind, counts, index, names))
+    return [name for name, count in total.most_common(n) if count > 0]
+
+def plot_trends(series, title, filename, figures_dir=TREND_FIGURES_DIR):
+    """
+    Draws one line per series ({label: {year: count}}) and saves the figure
+    """
+    import matplotlib.pyplot as plt
+    figures_dir = Path(figures_dir)
+    figures_dir.mkdir(parents=True, exist_ok=True)
+    plt.figure(figsize=(12, 6))
+    for label, counts in series.items():
+        years = sorted(counts)
+        plt.plot(years, [counts[y] for y in years], marker="o", label=label)
+    plt.title(title)
+    plt.xlabel("Year")
+    plt.ylabel("Count")
+    plt.xticks(rotation=45, ha="right")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(figures_dir / filename)
+    plt.close()
+    print(f"Trend plot saved to {figures_dir / filename}")
+
+def run_trend_analysis(categories, index=None, bib_path=MERGED_PATH):
+    """
+    Main function to:
+    - Add newly merged entries to the year partitions
+    - Plot product types, top venues and top keywords per category over time
+    """
+    updated = update_trend_store(parse_bibtex_entries(bib_path), categories, index)
+    print(f"Trend store: updated partitions {', '.join(updated) if updated else '(none)'}")
+    plot_trends({t: trend("types", t) for t in top_names("types", n=10)},
+                "Publications per Year by Product Type", "types.png")
+    plot_trends({v: trend("venues", v, index=index) for v in top_names("venues", index=index)},
+                "Top Venues per Year", "venues.png")
+    for category in categories:
+        keywords = top_names("keywords", category=category)
+        if keywords:
+            plot_trends({k: trend("keywords", k, category) for k in keywords},
+                        f"Keyword Trends - {category}",
+                        f"keywords_{category.lower().replace(' ', '_')}.png")